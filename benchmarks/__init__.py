@@ -0,0 +1,4 @@
+"""
+Benchmarks for rte_ecowatt, not collected by the test suite.
+Run one explicitly with: pytest benchmarks/bench_<name>.py -s --no-cov
+"""
@@ -0,0 +1,50 @@
+"""Query latency of calendar events lookup, index versus the previous linear scan"""
+import random
+import timeit
+
+from custom_components.rte_ecowatt.event_index import CalendarEventIndex
+from tests.test_event_index import linear_scan, random_events, random_window
+
+EVENT_COUNTS = (10, 100, 1000, 10000)
+# a calendar card asks for a few windows, a busy dashboard many distinct ones
+QUERY_COUNTS = (10, 1000)
+
+
+def test_query_latency():
+    rng = random.Random(0)
+    print()
+    print(
+        f"{'events':>7} {'queries':>8} {'linear µs/q':>12} {'index µs/q':>11} {'cached µs/q':>12}"
+    )
+    for event_count in EVENT_COUNTS:
+        events = random_events(rng, event_count)
+        for query_count in QUERY_COUNTS:
+            windows = [random_window(rng) for _ in range(query_count)]
+
+            def scan():
+                for window in windows:
+                    linear_scan(events, *window)
+
+            def index_cold():
+                # a fresh index per run, every window is a cache miss
+                index = CalendarEventIndex(events)
+                for window in windows:
+                    index.query(*window)
+
+            warm_index = CalendarEventIndex(events)
+            for window in windows[:64]:
+                warm_index.query(*window)
+
+            def index_warm():
+                for window in windows[:64]:
+                    warm_index.query(*window)
+
+            runs = 3
+            linear = min(timeit.repeat(scan, number=1, repeat=runs)) / query_count
+            cold = min(timeit.repeat(index_cold, number=1, repeat=runs)) / query_count
+            warm = min(timeit.repeat(index_warm, number=1, repeat=runs)) / min(
+                64, query_count
+            )
+            print(
+                f"{event_count:>7} {query_count:>8} {linear * 1e6:>12.1f} {cold * 1e6:>11.1f} {warm * 1e6:>12.2f}"
+            )
@@ -0,0 +1,86 @@
+"""
+Cost of covering the whole forecast with one sensor per horizon
+versus reading it from the single forecast sensor
+"""
+from datetime import datetime
+import tracemalloc
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import json_bytes
+import pytest
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.rte_ecowatt.const import (
+    CONF_SENSOR_SHIFT,
+    CONF_SENSOR_UNIT,
+    DOMAIN,
+)
+from custom_components.rte_ecowatt.parsing import PARIS_TZ
+from tests.common import (
+    ALTERNATING_LEVELS,
+    async_simulate_hours,
+    entry_data,
+    frozen_now,
+    recorded_rows,
+    signals_body,
+)
+
+# every horizon the options flow allows
+ONE_SENSOR_PER_HORIZON = [
+    {CONF_SENSOR_UNIT: "hours", CONF_SENSOR_SHIFT: shift} for shift in range(1, 72)
+] + [{CONF_SENSOR_UNIT: "days", CONF_SENSOR_SHIFT: shift} for shift in range(1, 4)]
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Recorder has to be set up before hass fixture"""
+    yield
+
+
+async def _rows(hass):
+    await async_wait_recording_done(hass)
+    return await get_instance(hass).async_add_executor_job(recorded_rows, hass)
+
+
+@pytest.mark.parametrize(
+    ("setup", "sensors"),
+    [("one sensor per horizon", ONE_SENSOR_PER_HORIZON), ("forecast sensor", [])],
+)
+async def test_forecast_cost(paris_hass, setup_entry, setup, sensors):
+    hass = paris_hass
+    midnight = datetime.now(PARIS_TZ).replace(hour=0, minute=10)
+    tracemalloc.start()
+    try:
+        with frozen_now(midnight):
+            entry = await setup_entry(
+                body=signals_body(hourly_levels=ALTERNATING_LEVELS),
+                data=entry_data(sensors=sensors),
+            )
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    registry_entries = len(
+        er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+    )
+    states = [
+        state
+        for state in hass.states.async_all()
+        if state.entity_id.split(".")[1].startswith("ecowatt")
+    ]
+    state_size = sum(len(json_bytes(state.as_dict())) for state in states)
+
+    before = await _rows(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
+    await async_simulate_hours(hass, coordinator, midnight, 24)
+    after = await _rows(hass)
+    (rows, attributes, size) = (after[i] - before[i] for i in range(3))
+    print(
+        f"\n{setup}: {registry_entries} registry entries, "
+        f"{len(states)} ecowatt states ({state_size / 1024:.1f} KiB as JSON), "
+        f"{memory / 1024:.0f} KiB allocated by setup; "
+        f"one day: {rows} states rows, {attributes} state_attributes rows "
+        f"({size / 1024:.1f} KiB of attributes)"
+    )
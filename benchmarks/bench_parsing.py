@@ -0,0 +1,35 @@
+"""Timestamp parsing, parsing module versus the strptime based functions it replaced"""
+import timeit
+
+from custom_components.rte_ecowatt.parsing import parse_enedis_time, parse_rte_time
+from tests.test_parsing import strptime_enedis_time, strptime_rte_time
+
+# a shedding answer holds three timestamps per event, RTE sends four days
+ENEDIS_VALUES = [
+    f"{day:02d}/01/2023 {hour:02d}:00" for day in (1, 2) for hour in (6, 8, 18)
+]
+RTE_VALUES = [f"2023-01-{day:02d}T00:00:00+01:00" for day in range(1, 5)]
+NUMBER = 2000
+
+
+def _per_call(func, values) -> float:
+    def run():
+        for value in values:
+            func(value)
+
+    return min(timeit.repeat(run, number=NUMBER, repeat=3)) / (NUMBER * len(values))
+
+
+def _report(name, old, new, values):
+    memo_free = new.__wrapped__
+    new.cache_clear()
+    print(
+        f"{name:>7} {_per_call(old, values) * 1e6:>12.2f} {_per_call(memo_free, values) * 1e6:>12.2f} {_per_call(new, values) * 1e6:>12.2f}"
+    )
+
+
+def test_parsing_speed():
+    print()
+    print(f"{'api':>7} {'strptime µs':>12} {'fast path µs':>12} {'memoized µs':>12}")
+    _report("enedis", strptime_enedis_time, parse_enedis_time, ENEDIS_VALUES)
+    _report("rte", strptime_rte_time, parse_rte_time, RTE_VALUES)
@@ -0,0 +1,59 @@
+"""Recorder rows added by one day of hour ticks, with and without excluded attributes"""
+from datetime import datetime
+from unittest.mock import patch
+
+from homeassistant.components.recorder import get_instance
+import pytest
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.rte_ecowatt import recorder as recorder_platform
+from custom_components.rte_ecowatt.const import DOMAIN
+from custom_components.rte_ecowatt.parsing import PARIS_TZ
+from tests.common import (
+    ALTERNATING_LEVELS,
+    async_simulate_hours,
+    entry_data,
+    frozen_now,
+    hourly_sensors,
+    recorded_rows,
+    signals_body,
+)
+
+SENSOR_COUNT = 10
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Recorder has to be set up before hass fixture"""
+    yield
+
+
+async def _rows(hass):
+    await async_wait_recording_done(hass)
+    return await get_instance(hass).async_add_executor_job(recorded_rows, hass)
+
+
+@pytest.mark.parametrize("excluded", [False, True])
+async def test_rows_per_day(paris_hass, setup_entry, excluded):
+    hass = paris_hass
+    midnight = datetime.now(PARIS_TZ).replace(hour=0, minute=10)
+    exclusion = recorder_platform.exclude_attributes if excluded else lambda _: set()
+    with patch.object(recorder_platform, "exclude_attributes", exclusion):
+        with frozen_now(midnight):
+            entry = await setup_entry(
+                body=signals_body(hourly_levels=ALTERNATING_LEVELS),
+                data=entry_data(sensors=hourly_sensors(SENSOR_COUNT)),
+            )
+        before = await _rows(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
+
+    await async_simulate_hours(hass, coordinator, midnight, 24)
+    after = await _rows(hass)
+    (states, attributes, size) = (after[i] - before[i] for i in range(3))
+    label = "with excluded attributes" if excluded else "recording all attributes"
+    print(
+        f"\n{SENSOR_COUNT} hourly sensors, one day, {label}: {states} states rows, "
+        f"{attributes} state_attributes rows ({size / 1024:.1f} KiB of attributes)"
+    )
@@ -0,0 +1,32 @@
+"""Time taken by config entry setup depending on the number of configured sensors"""
+import time
+
+import pytest
+from homeassistant.core import State
+from pytest_homeassistant_custom_component.common import mock_restore_cache
+
+from custom_components.rte_ecowatt.const import CONF_SENSOR_SHIFT
+from tests.common import entry_data, hourly_sensors
+
+
+@pytest.mark.parametrize("sensor_count", [1, 10, 80])
+async def test_setup_duration(paris_hass, setup_entry, sensor_count):
+    hass = paris_hass
+    sensors = hourly_sensors(sensor_count)
+    # every sensor has a state to restore, as after a restart
+    mock_restore_cache(
+        hass,
+        [
+            State(
+                f"sensor.ecowatt_level_today_and_{sensor[CONF_SENSOR_SHIFT]}_hours",
+                "Situation normale",
+            )
+            for sensor in sensors
+        ],
+    )
+    start = time.perf_counter()
+    await setup_entry(data=entry_data(sensors=sensors))
+    duration = time.perf_counter() - start
+    print(
+        f"\n{sensor_count:>3} configured sensors: setup took {duration * 1000:.1f} ms"
+    )
@@ -0,0 +1,39 @@
+"""Cost of one coordinator update with many sensors, cached timezone versus resolving it on each call"""
+import time
+from unittest.mock import PropertyMock, patch
+
+from dateutil import tz
+
+from custom_components.rte_ecowatt import TimezoneResolver
+from custom_components.rte_ecowatt.const import DOMAIN
+from tests.common import entry_data, hourly_sensors
+
+SENSOR_COUNT = 80
+UPDATES = 50
+
+
+def _update_duration(hass, coordinator) -> float:
+    start = time.perf_counter()
+    for _ in range(UPDATES):
+        # a new payload makes every sensor evaluate its level again
+        coordinator.data_version += 1
+        coordinator.async_update_listeners()
+    return (time.perf_counter() - start) / UPDATES
+
+
+async def test_update_duration(paris_hass, setup_entry):
+    hass = paris_hass
+    entry = await setup_entry(data=entry_data(sensors=hourly_sensors(SENSOR_COUNT)))
+    coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
+
+    cached = _update_duration(hass, coordinator)
+    # how timezone was resolved before TimezoneResolver
+    uncached_tzinfo = PropertyMock(
+        side_effect=lambda: tz.gettz(hass.config.as_dict()["time_zone"])
+    )
+    with patch.object(TimezoneResolver, "tzinfo", uncached_tzinfo):
+        uncached = _update_duration(hass, coordinator)
+    print(
+        f"\n{SENSOR_COUNT} sensors, one update: {uncached * 1000:.2f} ms resolving timezone on each call, "
+        f"{cached * 1000:.2f} ms with cached timezone ({uncached_tzinfo.call_count // UPDATES} lookups per update)"
+    )
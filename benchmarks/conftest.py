@@ -0,0 +1,6 @@
+# fixtures are shared with the test suite rather than duplicated
+from tests.conftest import (  # noqa: F401
+    auto_enable_custom_integrations,
+    paris_hass,
+    setup_entry,
+)
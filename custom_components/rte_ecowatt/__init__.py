@@ -1,20 +1,28 @@
 import os
 import re
 import json
+import time
+import base64
+import hashlib
+import asyncio
 import urllib.parse
 import logging
-from datetime import timedelta, datetime
-from zoneinfo import ZoneInfo
+from datetime import timedelta, datetime, timezone
 from typing import Any, Dict, Optional, Tuple
 from dateutil import tz
 from itertools import dropwhile, takewhile
 from oauthlib.oauth2 import BackendApplicationClient
 from async_oauthlib import OAuth2Session
 import aiohttp
+import httpx
 
 
-from homeassistant.const import Platform, STATE_ON
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import Platform, STATE_ON, EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+import voluptuous as vol
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import EntityCategory
@@ -24,7 +32,9 @@ from homeassistant.helpers.update_coordinator import (
     UpdateFailed,
 )
 from homeassistant.helpers.httpx_client import get_async_client
-from homeassistant.components.sensor import RestoreSensor
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.event import async_call_later, async_track_time_change
+from homeassistant.components.sensor import RestoreSensor, SensorEntity
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 
 from .const import (
@@ -32,6 +42,20 @@ from .const import (
     CONF_CLIENT_SECRET,
     CONF_ENEDIS_LOAD_SHEDDING,
     TOKEN_URL,
+    TOKEN_EXPIRY_MARGIN,
+    TOKEN_STORAGE_KEY,
+    SIGNALS_STORAGE_KEY,
+    RTE_QUOTA_WINDOW,
+    DEFAULT_RTE_UPDATE_INTERVAL,
+    RTE_RETRY_BASE_DELAY,
+    RTE_RETRY_MAX_DELAY,
+    CONF_MAX_STALENESS,
+    DEFAULT_MAX_STALENESS_MINUTES,
+    ADDRESS_STORAGE_KEY,
+    ADDRESS_CACHE_PRECISION,
+    HTTP_POOL_SIZE,
+    LOG_BODY_MAX_LENGTH,
+    STORAGE_VERSION,
     BASE_URL,
     ATTR_LEVEL_CODE,
     CONF_SENSOR_UNIT,
@@ -40,25 +64,207 @@ from .const import (
     ATTR_GENERATION_TIME,
     ATTR_PERIOD_START,
     ATTR_PERIOD_END,
+    ATTR_HOURLY_LEVELS,
+    ATTR_DAILY_LEVELS,
+    SERVICE_ADD_MAINTENANCE_WINDOW,
     DOMAIN,
 )
+from .rate_limit import RteRateLimiter, parse_retry_after
+from .event_index import CalendarEventIndex
+from .forecast import EcowattForecast
+from .parsing import parse_enedis_time, parse_rte_time
+from .scheduling import PublicationScheduler
+from .maintenance import MaintenanceRegistry
+from .resilience import (
+    CircuitBreaker,
+    TransientError,
+    async_retry,
+    jittered_backoff,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+MAINTENANCE_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Required("start"): cv.datetime,
+        vol.Required("end"): cv.datetime,
+    }
+)
+
+
+async def _async_maintenance_registry(hass: HomeAssistant) -> MaintenanceRegistry:
+    """Maintenance windows are shared by all entries, as is the service to add them"""
+    if "maintenance_windows" in hass.data[DOMAIN]:
+        return hass.data[DOMAIN]["maintenance_windows"]
+    registry = MaintenanceRegistry(hass)
+    hass.data[DOMAIN]["maintenance_windows"] = registry
+    await registry.async_load()
+
+    async def async_add_maintenance_window(call: ServiceCall) -> None:
+        # naive datetimes (as sent by the datetime selector) are in HA timezone
+        start = dt_util.as_utc(call.data["start"]).timestamp()
+        end = dt_util.as_utc(call.data["end"]).timestamp()
+        try:
+            await registry.async_add(start, end)
+        except ValueError as err:
+            raise HomeAssistantError(str(err)) from err
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ADD_MAINTENANCE_WINDOW,
+        async_add_maintenance_window,
+        schema=MAINTENANCE_WINDOW_SCHEMA,
+    )
+    return registry
+
+
+def _signals_url() -> str:
+    if "ECOWATT_DEBUG" in os.environ:
+        return f"{BASE_URL}/open_api/ecowatt/v4/sandbox/signals"
+    return f"{BASE_URL}/open_api/ecowatt/v4/signals"
+
+
+def _rte_coordinator_key(entry: ConfigEntry) -> str:
+    # signals are national, entries with different credentials get the same payload
+    return _signals_url()
+
+
+async def _async_acquire_rte_coordinator(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    maintenance_windows: MaintenanceRegistry,
+) -> "EcoWattAPICoordinator":
+    """
+    Entries calling the same RTE endpoint share a single coordinator, even with
+    different credentials, so that they consume one quota and parse each payload once
+    """
+    shared = hass.data[DOMAIN].setdefault("rte_coordinators", {})
+    key = _rte_coordinator_key(entry)
+    if key not in shared:
+        timezone_resolver = TimezoneResolver(hass)
+        config = dict(entry.data)
+        config[CONF_MAX_STALENESS] = entry_setting(
+            entry, CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS_MINUTES
+        )
+        coordinator = EcoWattAPICoordinator(
+            hass, config, timezone_resolver, maintenance_windows
+        )
+        shared[key] = {
+            "coordinator": coordinator,
+            # entry id -> max staleness in minutes requested by that entry
+            "entries": {},
+            # entry id -> entry data, to switch credential when its owner is unloaded
+            "configs": {},
+            # entries set up concurrently wait for the same loading
+            "loading": hass.async_create_task(coordinator.async_load()),
+            "unsubscribes": [
+                hass.bus.async_listen(
+                    EVENT_CORE_CONFIG_UPDATE, timezone_resolver.async_invalidate
+                ),
+                # levels depend on the current hour, re-evaluate entities when it changes
+                async_track_time_change(
+                    hass, coordinator.async_handle_hour_change, minute=0, second=0
+                ),
+            ],
+        }
+    else:
+        _LOGGER.debug("Reusing RTE coordinator of another entry with same endpoint")
+    shared_coordinator = shared[key]
+    try:
+        await shared_coordinator["loading"]
+    except Exception:
+        # do not cache the failure, next setup attempt starts from scratch
+        if shared.get(key) is shared_coordinator:
+            await _async_close_rte_coordinator(shared.pop(key))
+        raise
+    shared_coordinator["entries"][entry.entry_id] = entry_setting(
+        entry, CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS_MINUTES
+    )
+    shared_coordinator["configs"][entry.entry_id] = dict(entry.data)
+    _update_max_staleness(shared_coordinator)
+    return shared_coordinator["coordinator"]
+
+
+def _update_max_staleness(shared_coordinator: Dict[str, Any]) -> None:
+    # the most demanding entry decides how stale data can be
+    scheduler = shared_coordinator["coordinator"].scheduler
+    scheduler.max_staleness = max(
+        scheduler.min_interval,
+        timedelta(minutes=min(shared_coordinator["entries"].values())),
+    )
+
+
+async def _async_close_rte_coordinator(shared_coordinator: Dict[str, Any]) -> None:
+    for unsubscribe in shared_coordinator["unsubscribes"]:
+        unsubscribe()
+    await shared_coordinator["coordinator"].async_close()
+
+
+async def _async_release_rte_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> None:
+    shared = hass.data[DOMAIN].get("rte_coordinators", {})
+    key = _rte_coordinator_key(entry)
+    if key not in shared:
+        return
+    shared[key]["entries"].pop(entry.entry_id, None)
+    shared[key]["configs"].pop(entry.entry_id, None)
+    if not shared[key]["entries"]:
+        await _async_close_rte_coordinator(shared.pop(key))
+        return
+    _update_max_staleness(shared[key])
+    coordinator = shared[key]["coordinator"]
+    remaining = list(shared[key]["configs"].values())
+    if all(
+        config[CONF_CLIENT_ID] != coordinator.config[CONF_CLIENT_ID]
+        for config in remaining
+    ):
+        # credential of an unloaded entry must not be used anymore
+        await coordinator.async_use_credential(remaining[0])
+
+
+def entry_setting(entry: ConfigEntry, key: str, default: Any) -> Any:
+    """Settings changed through options flow are in options, entry data is read only"""
+    return entry.options.get(key, entry.data.get(key, default))
+
+
+def entity_unique_id_suffix(entry: ConfigEntry) -> str:
+    """
+    Entities of the first entry for a credential keep their historical unique ids,
+    those of additional entries are scoped by entry
+    """
+    if entry.unique_id in (None, entry.data[CONF_CLIENT_ID]):
+        return ""
+    return f"-{entry.entry_id}"
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.info("Called async setup entry from __init__.py")
 
     hass.data.setdefault(DOMAIN, {})
+    maintenance_windows = await _async_maintenance_registry(hass)
 
     # here we store the coordinator for future access
     if entry.entry_id not in hass.data[DOMAIN]:
         hass.data[DOMAIN][entry.entry_id] = {}
-    hass.data[DOMAIN][entry.entry_id]["rte_coordinator"] = EcoWattAPICoordinator(
-        hass, dict(entry.data)
+    # RTE coordinator may be shared with other entries and has its own resolver
+    timezone_resolver = TimezoneResolver(hass)
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            EVENT_CORE_CONFIG_UPDATE, timezone_resolver.async_invalidate
+        )
     )
-    hass.data[DOMAIN][entry.entry_id]["enedis_coordinator"] = EnedisAPICoordinator(
-        hass, dict(entry.data)
+    rte_coordinator = await _async_acquire_rte_coordinator(
+        hass, entry, maintenance_windows
+    )
+    hass.data[DOMAIN][entry.entry_id]["rte_coordinator"] = rte_coordinator
+    enedis_coordinator = EnedisAPICoordinator(hass, dict(entry.data), timezone_resolver)
+    hass.data[DOMAIN][entry.entry_id]["enedis_coordinator"] = enedis_coordinator
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            EVENT_CORE_CONFIG_UPDATE,
+            enedis_coordinator.async_handle_core_config_update,
+        )
     )
 
     # will make sure async_setup_entry from sensor.py is called
@@ -90,69 +296,337 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_release_rte_coordinator(hass, entry)
+        if not any(
+            other.entry_id in hass.data[DOMAIN]
+            for other in hass.config_entries.async_entries(DOMAIN)
+        ):
+            # last loaded entry, maintenance windows are reloaded with the next one
+            hass.services.async_remove(DOMAIN, SERVICE_ADD_MAINTENANCE_WINDOW)
+            hass.data[DOMAIN].pop("maintenance_windows", None)
     return unload_ok
 
 
+def _loggable_body(body: str) -> str:
+    """
+    Formats a payload for debug logs according to ECOWATT_LOG_BODY environment variable:
+    full (default), truncate (first LOG_BODY_MAX_LENGTH characters) or hash
+    """
+    mode = os.environ.get("ECOWATT_LOG_BODY", "full")
+    if mode == "hash":
+        digest = hashlib.sha256(body.encode()).hexdigest()
+        return f"<{len(body)} characters, sha256 {digest}>"
+    if mode == "truncate" and len(body) > LOG_BODY_MAX_LENGTH:
+        return f"{body[:LOG_BODY_MAX_LENGTH]}... <{len(body)} characters>"
+    return body
+
+
+class TimezoneResolver:
+    """Resolves HA timezone once and keeps it until HA configuration changes"""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._tzinfo = None
+
+    @property
+    def tzinfo(self):
+        if self._tzinfo is None:
+            self._tzinfo = tz.gettz(self.hass.config.time_zone)
+        return self._tzinfo
+
+    @callback
+    def async_invalidate(self, _event=None) -> None:
+        self._tzinfo = None
+
+
 class AsyncOauthClient:
-    def __init__(self, config):
+    def __init__(self, config, hass: Optional[HomeAssistant] = None):
         self.config = config
         self.token = ""
+        self._token_expires_at = 0.0
+        self._store = None
+        if hass is not None:
+            self._store = Store(
+                hass,
+                STORAGE_VERSION,
+                TOKEN_STORAGE_KEY.format(client_id=config[CONF_CLIENT_ID]),
+            )
+        # serialize token fetches so concurrent callers share a single request
+        self._token_lock = asyncio.Lock()
+        self.token_cache_hits = 0
+        self.token_cache_misses = 0
+        self._http_session = None
+        self.sessions_created = 0
+
+    def _token_is_valid(self) -> bool:
+        return bool(self.token) and time.time() < self._token_expires_at
+
+    async def async_load_token(self) -> None:
+        """Loads the token persisted by a previous run, if any"""
+        if self._store is None:
+            return
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self.token = stored["token"]
+        self._token_expires_at = stored["expires_at"]
+        if self._token_is_valid():
+            _LOGGER.debug("Loaded a persisted token for RTE API")
+
+    def invalidate_token(self) -> None:
+        """Forgets the cached token, e.g. when RTE rejected it"""
+        self.token = ""
+        self._token_expires_at = 0.0
+
+    def _session(self) -> OAuth2Session:
+        """Returns the long-lived session used for both token and api calls"""
+        if self._http_session is None or self._http_session.closed:
+            client = BackendApplicationClient(client_id=self.config[CONF_CLIENT_ID])
+            self._http_session = OAuth2Session(
+                client=client, connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE)
+            )
+            self.sessions_created += 1
+        return self._http_session
 
     async def client(self):
-        client = BackendApplicationClient(client_id=self.config[CONF_CLIENT_ID])
-        session = OAuth2Session(client=client)
-        auth = aiohttp.helpers.BasicAuth(
-            self.config[CONF_CLIENT_ID], self.config[CONF_CLIENT_SECRET]
-        )
-        self.token = await session.fetch_token(token_url=TOKEN_URL, auth=auth)
-        _LOGGER.debug("Fetched a token for RTE API")
+        session = self._session()
+        await self.async_token(session)
         return session
 
+    async def async_close(self) -> None:
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+
+    def connection_stats(self) -> Dict[str, Any]:
+        """Describes the state of the pooled session, for diagnostics"""
+        session = self._http_session
+        connector = None if session is None else session.connector
+        stats = {
+            "session_open": session is not None and not session.closed,
+            "sessions_created": self.sessions_created,
+            "active_connections": 0,
+            "idle_connections": 0,
+        }
+        if connector is not None and not connector.closed:
+            # aiohttp does not expose pool usage publicly
+            stats["active_connections"] = len(getattr(connector, "_acquired", ()))
+            stats["idle_connections"] = sum(
+                len(conns) for conns in getattr(connector, "_conns", {}).values()
+            )
+        return stats
+
+    async def async_token(self, session: OAuth2Session):
+        """Returns a valid token, fetching a new one only when the cached one is about to expire"""
+        async with self._token_lock:
+            if self._token_is_valid():
+                self.token_cache_hits += 1
+                session.token = self.token
+                _LOGGER.debug("Reusing cached token for RTE API")
+                return self.token
+            self.token_cache_misses += 1
+            auth = aiohttp.helpers.BasicAuth(
+                self.config[CONF_CLIENT_ID], self.config[CONF_CLIENT_SECRET]
+            )
+            self.token = await session.fetch_token(token_url=TOKEN_URL, auth=auth)
+            # refresh slightly before RTE considers the token expired
+            expires_in = float(self.token.get("expires_in", 0))
+            self._token_expires_at = time.time() + expires_in - TOKEN_EXPIRY_MARGIN
+            if self._store is not None:
+                await self._store.async_save(
+                    {"token": dict(self.token), "expires_at": self._token_expires_at}
+                )
+            _LOGGER.debug(
+                "Fetched a token for RTE API (cache hits: %d, misses: %d)",
+                self.token_cache_hits,
+                self.token_cache_misses,
+            )
+            return self.token
+
 
 class EcoWattAPICoordinator(DataUpdateCoordinator):
     """A coordinator to fetch data from the api only once"""
 
-    def __init__(self, hass, config: ConfigType):
+    def __init__(
+        self,
+        hass,
+        config: ConfigType,
+        timezone_resolver: Optional["TimezoneResolver"] = None,
+        maintenance_windows: Optional[MaintenanceRegistry] = None,
+    ):
         super().__init__(
             hass,
             _LOGGER,
             name="ecowatt api",  # for logging purpose
             update_method=self.update_method,
         )
-        self.config = config
         self.hass = hass
-        self.oauth_client = AsyncOauthClient(config)
+        self.timezone_resolver = timezone_resolver or TimezoneResolver(hass)
+        self._bind_credential(config)
+        self.maintenance_windows = maintenance_windows
+        self.last_fetch_time: Optional[datetime] = None
+        self.skipped_state_writes = 0
+        # (GenerationFichier, sha256 of body) of the payload held in data
+        self.fingerprint: Tuple[Optional[str], Optional[str]] = (None, None)
+        # incremented only when data content changes, lets entities skip recomputation
+        self.data_version = 0
+        self.scheduler = PublicationScheduler(
+            DEFAULT_RTE_UPDATE_INTERVAL,
+            timedelta(
+                minutes=config.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS_MINUTES)
+            ),
+        )
+        self._cancel_deferred_refresh = None
+        self.circuit_breaker = CircuitBreaker()
+
+    def _bind_credential(self, config: ConfigType) -> None:
+        """Token, quota and persisted payload belong to a credential"""
+        self.config = config
+        self.oauth_client = AsyncOauthClient(config, self.hass)
+        self._signals_store = Store(
+            self.hass,
+            STORAGE_VERSION,
+            SIGNALS_STORAGE_KEY.format(client_id=config[CONF_CLIENT_ID]),
+        )
+        # sandbox endpoint is not subject to quota
+        quota_window = RTE_QUOTA_WINDOW
+        if "ECOWATT_DEBUG" in os.environ:
+            quota_window = timedelta(0)
+        self.rate_limiter = RteRateLimiter(
+            self.hass, config[CONF_CLIENT_ID], quota_window
+        )
+
+    async def async_use_credential(self, config: ConfigType) -> None:
+        """Fetches with another credential from now on, keeping current data"""
+        _LOGGER.debug("Switching RTE coordinator to another credential")
+        await self.oauth_client.async_close()
+        self._bind_credential(config)
+        await self.oauth_client.async_load_token()
+        await self.rate_limiter.async_load()
+
+    async def async_load(self) -> None:
+        # reuse the token from before the restart if it is still valid
+        await self.oauth_client.async_load_token()
+        # serve the last known payload until the next allowed refresh
+        await self.async_load_cached_signals()
+        await self.rate_limiter.async_load()
+
+    async def async_close(self) -> None:
+        if self._cancel_deferred_refresh:
+            self._cancel_deferred_refresh()
+            self._cancel_deferred_refresh = None
+        await self.oauth_client.async_close()
+
+    @callback
+    def async_handle_hour_change(self, _now) -> None:
+        """Recomputes all entities from data we already have, without calling RTE API"""
+        if self.data is None:
+            return
+        _LOGGER.debug("Hour changed, updating ecowatt entities from known data")
+        self.async_update_listeners()
+
+    @callback
+    def async_defer_refresh(self) -> None:
+        """Schedules a single refresh at the time RTE quota allows it, coalescing repeated requests"""
+        if self._cancel_deferred_refresh:
+            return
+        delay = self.rate_limiter.time_until_allowed()
+        _LOGGER.debug("Deferring ecowatt refresh by %s", delay)
+
+        @callback
+        def _refresh(_now):
+            self._cancel_deferred_refresh = None
+            self.hass.async_create_task(self.async_request_refresh())
+
+        self._cancel_deferred_refresh = async_call_later(
+            self.hass, delay.total_seconds(), _refresh
+        )
 
     async def async_oauth_client(self):
         client = await self.oauth_client.client()
-        self.token = client.token
+        self.token = self.oauth_client.token
         return client
 
+    def _parse_signals(self, body: str) -> EcowattForecast:
+        return EcowattForecast.from_signals(json.loads(body)["signals"])
+
+    async def async_load_cached_signals(self) -> None:
+        """Hydrates data with the last payload persisted by a previous run"""
+        stored = await self._signals_store.async_load()
+        if not stored:
+            return
+        try:
+            self.data = self._parse_signals(stored["body"])
+            self.last_fetch_time = datetime.fromisoformat(stored["fetched_at"])
+        except Exception as err:
+            _LOGGER.warning(f"Ignoring unreadable cached ecowatt data: {err}")
+            return
+        self.fingerprint = (self.data.generation_time, stored.get("digest"))
+        self.data_version += 1
+        self.scheduler.history = stored.get("publications", [])
+        _LOGGER.debug(
+            f"Loaded cached ecowatt data fetched at {self.last_fetch_time} (generated at {stored['generation_time']})"
+        )
+
+    def cached_data_age(self) -> Optional[timedelta]:
+        """Returns how old is the data we hold, or None if we have nothing"""
+        if self.data is None or self.last_fetch_time is None:
+            return None
+        return datetime.now(timezone.utc) - self.last_fetch_time
+
+    async def _fetch_signals(self, client: OAuth2Session, url: str) -> str:
+        await self.rate_limiter.async_record_request()
+        try:
+            async with client.get(url, headers=self._auth_headers()) as api_result:
+                _LOGGER.info("data received, status code: %d", api_result.status)
+                status = api_result.status
+                retry_after = api_result.headers.get("Retry-After")
+                if status == 200:
+                    return await api_result.text()
+        except aiohttp.ClientConnectorError:
+            # RTE never saw this request, it can be retried right away
+            await self.rate_limiter.async_release_request()
+            raise
+        if status == 401:
+            # the cached token may have been revoked, try once with a fresh one.
+            # A rejected call is not served so it does not count against the quota
+            _LOGGER.info("RTE API rejected our token, fetching a new one")
+            self.oauth_client.invalidate_token()
+            await self.oauth_client.async_token(client)
+            self.token = self.oauth_client.token
+            async with client.get(url, headers=self._auth_headers()) as api_result:
+                _LOGGER.info("data received, status code: %d", api_result.status)
+                status = api_result.status
+                retry_after = api_result.headers.get("Retry-After")
+                if status == 200:
+                    return await api_result.text()
+        if status == 429:
+            # should not happen unless another client uses the same credentials
+            await self.rate_limiter.async_record_rejection(
+                parse_retry_after(retry_after)
+            )
+            raise UpdateFailed(
+                f"Error communicating with RTE API: requests too frequent to RTE API"
+            )
+        raise UpdateFailed(
+            f"Error communicating with RTE API: status code was {status}"
+        )
+
+    def _auth_headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"{self.token['token_type']} {self.token['access_token']}"
+        }
+
     def _timezone(self):
-        timezone = self.hass.config.as_dict()["time_zone"]
-        return tz.gettz(timezone)
+        return self.timezone_resolver.tzinfo
 
-    def skip_refresh(self) -> Optional[str]:
+    def maintenance_end(self) -> Optional[float]:
         """
-        Returns a string describing the reason to skip data refresh or None otherwise
+        Returns the timestamp at which current RTE API maintenance ends, None if there is none
         """
-        now = datetime.now(tz=self._timezone())
-        maintenances = [
-            [
-                datetime(2022, 11, 30, 4, 15, 00, tzinfo=ZoneInfo("Europe/Paris")),
-                timedelta(hours=1),
-            ],
-            [
-                datetime(2022, 12, 6, 4, 15, 00, tzinfo=ZoneInfo("Europe/Paris")),
-                timedelta(hours=1),
-            ],
-        ]
-        for maintenance in maintenances:
-            if now >= maintenance[0] and now < maintenance[0] + maintenance[1]:
-                return (
-                    f"Planned RTE API maintenance is happening until {maintenance[1]}"
-                )
-        return None
+        if self.maintenance_windows is None:
+            return None
+        return self.maintenance_windows.window_end(time.time())
 
     async def update_method(self):
         """Fetch data from API endpoint.
@@ -162,58 +636,159 @@ class EcoWattAPICoordinator(DataUpdateCoordinator):
         """
         try:
             _LOGGER.debug(
-                f"Calling update method, {len(self._listeners)} listeners subscribed"
+                "Calling update method, %d listeners subscribed", len(self._listeners)
             )
             if "ECOWATT_APIFAIL" in os.environ:
                 raise UpdateFailed(
                     "Failing update on purpose to test state restoration"
                 )
             _LOGGER.debug("Starting collecting data")
-            if self.skip_refresh():
-                _LOGGER.warning(f"Skipping data refresh because: {self.skip_refresh()}")
+            maintenance_end = self.maintenance_end()
+            if maintenance_end is not None:
+                delay = maintenance_end - time.time()
+                _LOGGER.warning(
+                    "Skipping data refresh because planned RTE API maintenance is happening for %d more seconds",
+                    delay,
+                )
+                # next refresh right after the maintenance
+                self.update_interval = timedelta(seconds=delay)
                 return self.data
-            client = await self.async_oauth_client()
-            headers = {
-                "Authorization": f"{self.token['token_type']} {self.token['access_token']}"
-            }
-            url = f"{BASE_URL}/open_api/ecowatt/v4/signals"
-            if "ECOWATT_DEBUG" in os.environ:
-                url = f"{BASE_URL}/open_api/ecowatt/v4/sandbox/signals"
-            api_result = await client.get(url, headers=headers)
-            _LOGGER.info(f"data received, status code: {api_result.status}")
-            if api_result.status == 429:
-                # a code 429 is expected when requesting more often than every 15minutes and not using the sandbox url
-                # FIXME(kamaradclimber): avoid this error when home assistant is restarting by storing state and last update
+            if not self.rate_limiter.can_request():
+                # coalesce this refresh with the one allowed by RTE quota
+                self.async_defer_refresh()
+                if self.data is not None:
+                    _LOGGER.debug(
+                        "Too early to call RTE API again, next call allowed at %s",
+                        self.rate_limiter.next_allowed,
+                    )
+                    return self.data
                 raise UpdateFailed(
-                    f"Error communicating with RTE API: requests too frequent to RTE API"
+                    f"RTE API quota reached, next call allowed at {self.rate_limiter.next_allowed}"
                 )
-            elif api_result.status != 200:
+            if not self.circuit_breaker.allow_request():
                 raise UpdateFailed(
-                    f"Error communicating with RTE API: status code was {api_result.status}"
+                    f"RTE API failed repeatedly, next try at {self.circuit_breaker.retry_at}"
+                )
+            url = _signals_url()
+            try:
+                # token endpoint is not subject to the quota
+                client = await async_retry(
+                    self.async_oauth_client,
+                    retry_on=(aiohttp.ClientError, asyncio.TimeoutError),
+                )
+                # only requests which never reached RTE give their quota back
+                body = await async_retry(
+                    lambda: self._fetch_signals(client, url),
+                    retry_on=(aiohttp.ClientConnectorError,),
                 )
-            body = await api_result.text()
-            await client.close()  # we won't need the client anymore
-            _LOGGER.debug(f"api response body: {body}")
-            signals = json.loads(body)["signals"]
-            for day_data in signals:
-                parsed_time = datetime.strptime(day_data["jour"], "%Y-%m-%dT%H:%M:%S%z")
-                day_data["date"] = parsed_time.date()
-                day_data["datetime"] = parsed_time
-
-            _LOGGER.debug(f"data parsed: {signals}")
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            self.circuit_breaker.record_success()
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("api response body: %s", _loggable_body(body))
+            digest = hashlib.sha256(body.encode()).hexdigest()
+            if self.data is not None and self.fingerprint[1] == digest:
+                # RTE has not published a new file, keep structures built from it
+                _LOGGER.debug("RTE payload is unchanged since last refresh")
+                signals = self.data
+            else:
+                signals = self._parse_signals(body)
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("data parsed: %s", _loggable_body(repr(signals)))
+                self.fingerprint = (signals.generation_time, digest)
+                self.data_version += 1
+                if signals.generation_time:
+                    self.scheduler.record(parse_rte_time(signals.generation_time))
+            self.last_fetch_time = datetime.now(timezone.utc)
+            await self._signals_store.async_save(
+                {
+                    "body": body,
+                    "fetched_at": self.last_fetch_time.isoformat(),
+                    "generation_time": signals.generation_time,
+                    "digest": digest,
+                    "publications": self.scheduler.history,
+                }
+            )
+            # next refresh is scheduled with this interval once we return
+            self.update_interval = self.scheduler.next_interval(self.last_fetch_time)
+            _LOGGER.debug("Next ecowatt refresh in %s", self.update_interval)
             return signals
         except Exception as err:
+            self.update_interval = self.retry_interval()
+            _LOGGER.debug(
+                "Next ecowatt refresh in %s after failure", self.update_interval
+            )
             raise UpdateFailed(f"Error communicating with API: {err}")
 
+    def retry_interval(self) -> timedelta:
+        """
+        After a failure, the next refresh happens as soon as quota and circuit breaker allow,
+        delayed by a jittered backoff growing with consecutive failures
+        """
+        allowed_in = max(
+            self.rate_limiter.time_until_allowed(),
+            self.circuit_breaker.time_until_allowed(),
+        )
+        backoff = jittered_backoff(
+            max(0, self.circuit_breaker.failures - 1),
+            RTE_RETRY_BASE_DELAY,
+            RTE_RETRY_MAX_DELAY,
+        )
+        return allowed_in + backoff
+
+
+class ChangeDetectingEntity:
+    """
+    Skips state writes when state and attributes are identical to the last ones written:
+    each write fires a state_changed event and inserts a row in recorder.
+    Skipped writes are counted on the coordinator
+    """
+
+    _last_written_snapshot = None
+
+    def _state_snapshot(self):
+        return (
+            self.state,
+            self.icon,
+            dict(self.state_attributes or {}),
+            dict(self.extra_state_attributes or {}),
+        )
+
+    @callback
+    def _async_write_ha_state_if_changed(self) -> None:
+        snapshot = self._state_snapshot()
+        if snapshot == self._last_written_snapshot:
+            self.coordinator.skipped_state_writes += 1
+            return
+        self._last_written_snapshot = snapshot
+        self.async_write_ha_state()
+
+
+class RestorableCoordinatedSensor(ChangeDetectingEntity, RestoreSensor):
+    _restored_event: Optional[asyncio.Event] = None
+
+    def _restoration(self) -> asyncio.Event:
+        if self._restored_event is None:
+            self._restored_event = asyncio.Event()
+        return self._restored_event
 
-class RestorableCoordinatedSensor(RestoreSensor):
     @property
     def restored(self):
-        return self._restored
+        return self._restoration().is_set()
+
+    async def async_wait_restored(self) -> None:
+        """Returns once state has been restored from previous run"""
+        await self._restoration().wait()
 
     def restore_even_if_unknown(self):
         return False
 
+    def add_to_platform_abort(self) -> None:
+        super().add_to_platform_abort()
+        # HA refused the entity (e.g. duplicate unique id), nothing will be restored
+        self._restoration().set()
+
     async def async_added_to_hass(self):
         await super().async_added_to_hass()
         _LOGGER.debug("starting to restore sensor from previous data")
@@ -231,15 +806,28 @@ class RestorableCoordinatedSensor(RestoreSensor):
                 # data as soon as possible
                 _LOGGER.debug(f"Stored state was 'unknown', starting from scratch")
         # signal restoration happened
-        self._restored = True
+        self._restoration().set()
+        if self.coordinator.data is not None:
+            # coordinator was hydrated from cache, it is more accurate than restored state
+            self._handle_coordinator_update()
 
 
-class DowngradedEcowattLevelCalendar(CoordinatorEntity, CalendarEntity):
-    def __init__(self, coordinator: EcoWattAPICoordinator, hass: HomeAssistant):
+class DowngradedEcowattLevelCalendar(
+    CoordinatorEntity, ChangeDetectingEntity, CalendarEntity
+):
+    def __init__(
+        self,
+        coordinator: EcoWattAPICoordinator,
+        hass: HomeAssistant,
+        unique_id_suffix: str = "",
+    ):
         CoordinatorEntity.__init__(self, coordinator)
         self.hass = hass
+        self._unique_id_suffix = unique_id_suffix
         self._attr_name = "Ecowatt downgraded level"
         self._events = []
+        self._built_data_version = None
+        self._event_index = CalendarEventIndex([])
 
     @property
     def event(self) -> Optional[CalendarEvent]:
@@ -249,44 +837,44 @@ class DowngradedEcowattLevelCalendar(CoordinatorEntity, CalendarEntity):
 
     @property
     def unique_id(self) -> str:
-        return f"ecowatt-downgraded-events"
+        return f"ecowatt-downgraded-events{self._unique_id_suffix}"
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        if self.coordinator.data is not None:
+            self._handle_coordinator_update()
 
     async def async_get_events(
         self, hass: HomeAssistant, start_date: datetime, end_date: datetime
     ) -> list[CalendarEvent]:
-        relevant_events = []
-        for event in self._events:
-            included = event.start <= start_date and event.end >= end_date
-            included = included or (
-                event.start >= start_date and event.start <= end_date
-            )
-            included = included or (event.end >= start_date and event.end <= end_date)
-            if included:
-                relevant_events.append(event)
-        return relevant_events
+        return self._event_index.query(start_date, end_date)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         if not self.coordinator.last_update_success:
             _LOGGER.debug("Last coordinator failed, assuming state has not changed")
             return
+        if self._built_data_version == self.coordinator.data_version:
+            return
+        self._built_data_version = self.coordinator.data_version
         events = []
-        for event in self.coordinator.data:
-            day_start = event["datetime"]
-            for hour in event["values"]:
-                start = day_start + timedelta(hours=hour["pas"])
-                if hour["hvalue"] > 1:
+        for day in self.coordinator.data:
+            for hour in range(24):
+                level = day.hourly_level(hour)
+                if level is not None and level > 1:
+                    start = day.start + timedelta(hours=hour)
                     events.append(
                         CalendarEvent(
                             start=start,
                             end=start + timedelta(hours=1),
-                            summary=self._level2string(hour["hvalue"]),
-                            description=f"Le niveau ecowatt prévu est {hour['hvalue']}",
+                            summary=self._level2string(level),
+                            description=f"Le niveau ecowatt prévu est {level}",
                         )
                     )
 
         self._events = self._merge_events(events)
-        self.async_write_ha_state()  # we probably don't need this line
+        self._event_index = CalendarEventIndex(self._events)
+        self._async_write_ha_state_if_changed()
 
     def _merge_events(self, events: list[CalendarEvent]) -> list[CalendarEvent]:
         events.sort(key=lambda e: e.start)
@@ -322,37 +910,59 @@ class AbstractEcowattLevel(CoordinatorEntity, RestorableCoordinatedSensor):
     """Representation of ecowatt level for a given day"""
 
     def __init__(
-        self, coordinator: EcoWattAPICoordinator, shift: int, hass: HomeAssistant
+        self,
+        coordinator: EcoWattAPICoordinator,
+        shift: int,
+        hass: HomeAssistant,
+        unique_id_suffix: str = "",
     ):
         super().__init__(coordinator)
-        self._restored = False
         self.hass = hass
+        self._unique_id_suffix = unique_id_suffix
         self._attr_extra_state_attributes: Dict[str, Any] = {}
         _LOGGER.info(f"Creating an ecowatt sensor, named {self.name}")
         self._state = None
         self.shift = shift
         self.happening_now = False
+        self._last_evaluation_key = None
 
     def _timezone(self):
-        timezone = self.hass.config.as_dict()["time_zone"]
-        return tz.gettz(timezone)
+        return self.coordinator.timezone_resolver.tzinfo
 
     def _find_ecowatt_level(self) -> int:
         raise NotImplementedError()
 
+    @property
+    def available(self) -> bool:
+        # a failed refresh keeps previous data, which still covers the next days
+        return super().available or self.coordinator.data is not None
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        if not self.coordinator.last_update_success:
-            _LOGGER.debug("Last coordinator failed, assuming state has not changed")
+        if self.coordinator.data is None:
+            _LOGGER.debug("No data from coordinator yet, keeping restored state")
+            return
+        # levels only depend on data and current hour
+        evaluation_key = (
+            self.coordinator.data_version,
+            datetime.now(self._timezone()).replace(minute=0, second=0, microsecond=0),
+        )
+        if evaluation_key == self._last_evaluation_key:
+            return
+        try:
+            ecowatt_level = self._find_ecowatt_level()
+        except RuntimeError as err:
+            # data (possibly loaded from cache) does not cover this sensor yet
+            _LOGGER.warning(f"Keeping previous state for '{self.name}': {err}")
             return
-        ecowatt_level = self._find_ecowatt_level()
+        self._last_evaluation_key = evaluation_key
         previous_level = self._attr_extra_state_attributes.get(ATTR_LEVEL_CODE, None)
         self._attr_extra_state_attributes[ATTR_LEVEL_CODE] = ecowatt_level
         self._state = self._level2string(ecowatt_level)
         self._attr_icon = self._level2icon(ecowatt_level)
         if previous_level != self._attr_extra_state_attributes[ATTR_LEVEL_CODE]:
             _LOGGER.info(f"updated '{self.name}' with level {self._state}")
-        self.async_write_ha_state()
+        self._async_write_ha_state_if_changed()
 
     def _level2string(self, level):
         if self.happening_now and level == 3:
@@ -392,19 +1002,23 @@ class AbstractEcowattLevel(CoordinatorEntity, RestorableCoordinatedSensor):
 
 
 class HourlyEcowattLevel(AbstractEcowattLevel):
-    def __init__(self, coordinator, shift: int, hass: HomeAssistant):
+    def __init__(
+        self, coordinator, shift: int, hass: HomeAssistant, unique_id_suffix: str = ""
+    ):
         days = shift // 24
         hours = shift % 24
         self._attr_name = f"Ecowatt level {self._day_string(days)} and {hours} hours"
         if shift == 0:
             self._attr_name = "Ecowatt level now"
-        super().__init__(coordinator, shift=shift, hass=hass)
+        super().__init__(
+            coordinator, shift=shift, hass=hass, unique_id_suffix=unique_id_suffix
+        )
         if shift == 0:  # this needs to happen after initialization of super
             self.happening_now = True
 
     @property
     def unique_id(self) -> str:
-        return f"ecowatt-level-in-{self.shift}-hours"
+        return f"ecowatt-level-in-{self.shift}-hours{self._unique_id_suffix}"
 
     def _find_ecowatt_level(self) -> int:
         now = datetime.now(self._timezone())
@@ -413,82 +1027,150 @@ class HourlyEcowattLevel(AbstractEcowattLevel):
         date_shift = self.shift // 24
         hour_shift = self.shift % 24
         relevant_date = now + timedelta(days=date_shift, hours=hour_shift)
-        _LOGGER.debug(f"Looking for {relevant_date}")
-        ecowatt_data = None
-        try:
-            ecowatt_data = next(
-                filter(
-                    lambda e: e["date"] == relevant_date.date(), self.coordinator.data
-                )
-            )
-            self._attr_extra_state_attributes[ATTR_GENERATION_TIME] = ecowatt_data[
-                "GenerationFichier"
-            ]
-            self._attr_extra_state_attributes[
-                ATTR_PERIOD_START
-            ] = relevant_date - timedelta(
-                minutes=relevant_date.minute, seconds=relevant_date.second
-            )
-            self._attr_extra_state_attributes[
-                ATTR_PERIOD_END
-            ] = self._attr_extra_state_attributes[ATTR_PERIOD_START] + timedelta(
-                hours=1
-            )
-            level = next(
-                filter(lambda e: e["pas"] == relevant_date.hour, ecowatt_data["values"])
-            )
-            return level["hvalue"]
-        except StopIteration:
+        _LOGGER.debug("Looking for %s", relevant_date)
+        ecowatt_data = self.coordinator.data.day(relevant_date.date())
+        level = None
+        if ecowatt_data is not None:
+            level = ecowatt_data.hourly_level(relevant_date.hour)
+        if level is None:
             _LOGGER.info(f"Data for relevant day: {ecowatt_data}")
             raise RuntimeError(
                 f"Unable to find ecowatt level for {relevant_date} (hour shift: {hour_shift})"
             )
+        self._attr_extra_state_attributes[
+            ATTR_GENERATION_TIME
+        ] = ecowatt_data.generation_time
+        self._attr_extra_state_attributes[
+            ATTR_PERIOD_START
+        ] = relevant_date - timedelta(
+            minutes=relevant_date.minute, seconds=relevant_date.second
+        )
+        self._attr_extra_state_attributes[
+            ATTR_PERIOD_END
+        ] = self._attr_extra_state_attributes[ATTR_PERIOD_START] + timedelta(hours=1)
+        return level
 
 
 class DailyEcowattLevel(AbstractEcowattLevel):
-    def __init__(self, coordinator, shift: int, hass: HomeAssistant):
+    def __init__(
+        self, coordinator, shift: int, hass: HomeAssistant, unique_id_suffix: str = ""
+    ):
         self._attr_name = f"Ecowatt level {self._day_string(shift)}"
-        super().__init__(coordinator, shift=shift, hass=hass)
+        super().__init__(
+            coordinator, shift=shift, hass=hass, unique_id_suffix=unique_id_suffix
+        )
 
     @property
     def unique_id(self) -> str:
-        return f"ecowatt-level-in-{self.shift}-days"
+        return f"ecowatt-level-in-{self.shift}-days{self._unique_id_suffix}"
 
     def _find_ecowatt_level(self) -> int:
         now = datetime.now(self._timezone())
         if "ECOWATT_DEBUG" in os.environ:
             now = datetime(2022, 6, 3, 8, 0, 0, tzinfo=self._timezone())
         relevant_date = now + timedelta(days=self.shift)
-        try:
-            ecowatt_data = next(
-                filter(
-                    lambda e: e["date"] == relevant_date.date(), self.coordinator.data
-                )
-            )
-            self._attr_extra_state_attributes[ATTR_GENERATION_TIME] = ecowatt_data[
-                "GenerationFichier"
-            ]
-            self._attr_extra_state_attributes[
-                ATTR_PERIOD_START
-            ] = relevant_date - timedelta(
-                hours=relevant_date.hour,
-                minutes=relevant_date.minute,
-                seconds=relevant_date.second,
-            )
-            self._attr_extra_state_attributes[
-                ATTR_PERIOD_END
-            ] = self._attr_extra_state_attributes[ATTR_PERIOD_START] + timedelta(days=1)
-            return ecowatt_data["dvalue"]
-        except StopIteration:
+        ecowatt_data = self.coordinator.data.day(relevant_date.date())
+        if ecowatt_data is None:
             raise RuntimeError(
                 f"Unable to find ecowatt level for {relevant_date.date()}"
             )
+        self._attr_extra_state_attributes[
+            ATTR_GENERATION_TIME
+        ] = ecowatt_data.generation_time
+        self._attr_extra_state_attributes[
+            ATTR_PERIOD_START
+        ] = relevant_date - timedelta(
+            hours=relevant_date.hour,
+            minutes=relevant_date.minute,
+            seconds=relevant_date.second,
+        )
+        self._attr_extra_state_attributes[
+            ATTR_PERIOD_END
+        ] = self._attr_extra_state_attributes[ATTR_PERIOD_START] + timedelta(days=1)
+        return ecowatt_data.level
+
+
+async def _gather_or_cancel(*awaitables):
+    """Like asyncio.gather but cancels remaining awaitables as soon as one fails"""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+class EcowattForecastSensor(AbstractEcowattLevel):
+    """
+    Exposes the whole forecast in a single entity: state is the current level,
+    attributes hold hourly levels starting at current hour and daily levels starting today
+    """
+
+    def __init__(self, coordinator, hass: HomeAssistant, unique_id_suffix: str = ""):
+        self._attr_name = "Ecowatt forecast"
+        super().__init__(
+            coordinator, shift=0, hass=hass, unique_id_suffix=unique_id_suffix
+        )
+        self.happening_now = True
+
+    @property
+    def unique_id(self) -> str:
+        return f"ecowatt-forecast{self._unique_id_suffix}"
+
+    def _find_ecowatt_level(self) -> int:
+        now = datetime.now(self._timezone())
+        if "ECOWATT_DEBUG" in os.environ:
+            now = datetime(2022, 6, 3, 8, 0, 0, tzinfo=self._timezone())
+        today = now.date()
+        hourly_levels = []
+        daily_levels = []
+        for day in self.coordinator.data:
+            if day.date < today:
+                continue
+            first_hour = now.hour if day.date == today else 0
+            hourly_levels.extend(day.hourly_level(h) for h in range(first_hour, 24))
+            daily_levels.append(day.level)
+        if not hourly_levels or hourly_levels[0] is None:
+            raise RuntimeError(f"Unable to find ecowatt level for {now}")
+        self._attr_extra_state_attributes[
+            ATTR_GENERATION_TIME
+        ] = self.coordinator.data.generation_time
+        self._attr_extra_state_attributes[ATTR_PERIOD_START] = now - timedelta(
+            minutes=now.minute, seconds=now.second, microseconds=now.microsecond
+        )
+        self._attr_extra_state_attributes[ATTR_HOURLY_LEVELS] = hourly_levels
+        self._attr_extra_state_attributes[ATTR_DAILY_LEVELS] = daily_levels
+        return hourly_levels[0]
+
+
+def _jwt_expiry(token: str) -> Optional[float]:
+    """Reads the exp claim of a JWT, without verifying it"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError) as err:
+        _LOGGER.debug(f"Unable to read expiry of enedis token: {err}")
+        return None
+
+
+def _raise_for_status(response: httpx.Response, message: str) -> None:
+    """Server errors are worth retrying, other failures are not"""
+    if response.is_server_error:
+        raise TransientError(message)
+    raise UpdateFailed(message)
 
 
 class EnedisAPICoordinator(DataUpdateCoordinator):
     """A coordinator to fetch data from the api only once"""
 
-    def __init__(self, hass, config: ConfigType):
+    def __init__(
+        self,
+        hass,
+        config: ConfigType,
+        timezone_resolver: Optional["TimezoneResolver"] = None,
+    ):
         super().__init__(
             hass,
             _LOGGER,
@@ -497,7 +1179,17 @@ class EnedisAPICoordinator(DataUpdateCoordinator):
         )
         self.config = config
         self.hass = hass
+        self.timezone_resolver = timezone_resolver or TimezoneResolver(hass)
         self._async_client = None
+        self.skipped_state_writes = 0
+        self._address_store = Store(hass, STORAGE_VERSION, ADDRESS_STORAGE_KEY)
+        self._address_cache: Optional[Dict[str, Any]] = None
+        self._address_cache_loaded = False
+        self._xtick_step: Optional[str] = None
+        self._jwt_token: Optional[str] = None
+        self._jwt_expires_at = 0.0
+        self.step_durations: Dict[str, float] = {}
+        self.circuit_breaker = CircuitBreaker()
 
     async def async_client(self):
         if not self._async_client:
@@ -505,26 +1197,54 @@ class EnedisAPICoordinator(DataUpdateCoordinator):
         return self._async_client
 
     def _timezone(self):
-        timezone = self.hass.config.as_dict()["time_zone"]
-        return tz.gettz(timezone)
+        return self.timezone_resolver.tzinfo
+
+    def _coordinates(self) -> Tuple[float, float]:
+        if "ECOWATT_DEBUG" in os.environ:
+            return (48.841, 2.3332)
+        return (self.hass.config.latitude, self.hass.config.longitude)
+
+    @callback
+    def async_handle_core_config_update(self, _event) -> None:
+        """Forgets the cached address, HA location may have changed"""
+        _LOGGER.debug("HA configuration changed, address will be fetched again")
+        self._address_cache = None
+        self._address_cache_loaded = True
 
     async def fetch_street_and_insee_code(self) -> Tuple[str, str]:
+        (lat, lon) = self._coordinates()
+        key = [round(lat, ADDRESS_CACHE_PRECISION), round(lon, ADDRESS_CACHE_PRECISION)]
+        if not self._address_cache_loaded:
+            self._address_cache = await self._address_store.async_load()
+            self._address_cache_loaded = True
+        if self._address_cache and self._address_cache["coordinates"] == key:
+            return (self._address_cache["street"], self._address_cache["insee_code"])
+        (street, insee_code) = await self._fetch_street_and_insee_code(lat, lon)
+        self._address_cache = {
+            "coordinates": key,
+            "street": street,
+            "insee_code": insee_code,
+        }
+        await self._address_store.async_save(self._address_cache)
+        return (street, insee_code)
+
+    async def _fetch_street_and_insee_code(
+        self, lat: float, lon: float
+    ) -> Tuple[str, str]:
         client = await self.async_client()
-        if "ECOWATT_DEBUG" in os.environ:
-            lat = 48.841
-            lon = 2.3332
-        else:
-            lat = self.hass.config.as_dict()["latitude"]
-            lon = self.hass.config.as_dict()["longitude"]
         r = await client.get(
             f"https://api-adresse.data.gouv.fr/reverse/?lat={lat}&lon={lon}&type=housenumber"
         )
         if not r.is_success:
-            raise UpdateFailed(
-                "Failed to fetch address from api-adresse.data.gouv.fr api"
+            _raise_for_status(
+                r, "Failed to fetch address from api-adresse.data.gouv.fr api"
             )
         data = r.json()
-        _LOGGER.debug(f"Data received from api-adresse.data.gouv.fr: {data}")
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Data received from api-adresse.data.gouv.fr: %s",
+                _loggable_body(str(data)),
+            )
         if len(data["features"]) == 0:
             _LOGGER.warn(
                 f"Data received from api-adresse.data.gouv.fr is empty for those coordinates: ({lat}, {lon}). Are you sure they are located in France?"
@@ -535,101 +1255,151 @@ class EnedisAPICoordinator(DataUpdateCoordinator):
         properties = data["features"][0]["properties"]
         return (properties["street"], properties["citycode"])
 
+    async def _fetch_xtick_step(self) -> str:
+        client = await self.async_client()
+        r = await client.get(
+            "https://megacache.p.web-enedis.fr/anon/v2/shedding/state_js"
+        )
+        if not r.is_success:
+            _LOGGER.warn(
+                f"Failure to fetch data from /shedding/state_js endpoint: {r.text}"
+            )
+            _raise_for_status(r, "Failed fetching enedis data at step 1")
+        match = re.search(r"^.+var xtick0\s*=\s*'(.+)'.*$", r.text)
+        if not match:
+            raise UpdateFailed(f"Impossible to find expected data in {r.text}")
+        return match.groups()[0]
+
+    async def _fetch_jwt_token(self, step: str) -> Optional[str]:
+        client = await self.async_client()
+        r = await client.post(
+            "https://megacache.p.web-enedis.fr/v2/g/trace", json={"step": step}
+        )
+        if not r.is_success:
+            _LOGGER.warn(f"Failure to fetch data from /v2/g/trace endpoint: {r.text}")
+            if r.is_server_error:
+                _raise_for_status(r, "Failed fetching enedis data at step 2")
+            # most likely an outdated step, caller fetches a new one
+            return None
+        return r.json()["token"]
+
+    async def async_jwt_token(self) -> str:
+        """
+        Returns a token for /v2/shedding endpoint. Token and the xtick step used to get it
+        are reused until shortly before the token expires
+        """
+        if self._jwt_token and time.time() < self._jwt_expires_at:
+            return self._jwt_token
+        jwt_token = None
+        if self._xtick_step:
+            jwt_token = await self._fetch_jwt_token(self._xtick_step)
+        if jwt_token is None:
+            # cached step is missing or outdated
+            self._xtick_step = await self._fetch_xtick_step()
+            jwt_token = await self._fetch_jwt_token(self._xtick_step)
+        if jwt_token is None:
+            raise UpdateFailed("Failed fetching enedis data at step 2")
+        _LOGGER.debug("Fetched token %s from enedis api", jwt_token)
+        self._jwt_token = jwt_token
+        expiry = _jwt_expiry(jwt_token)
+        self._jwt_expires_at = 0.0 if expiry is None else expiry - TOKEN_EXPIRY_MARGIN
+        return jwt_token
+
+    async def _timed(self, step: str, awaitable):
+        """Awaits and records how long it took, for diagnostics"""
+        start = time.monotonic()
+        try:
+            return await awaitable
+        finally:
+            self.step_durations[step] = round(time.monotonic() - start, 3)
+
+    async def _fetch_shedding(self) -> Dict[str, Any]:
+        client = await self.async_client()
+        # authentication and address lookup do not depend on each other
+        (jwt_token, (street, city_code)) = await _gather_or_cancel(
+            self._timed("authentication", self.async_jwt_token()),
+            self._timed("address", self.fetch_street_and_insee_code()),
+        )
+        encoded_street = urllib.parse.quote_plus(street)
+
+        url = f"https://megacache.p.web-enedis.fr/v2/shedding?street={encoded_street}&insee_code={city_code}"
+        _LOGGER.debug("Requesting shedding from %s", url)
+        r = await self._timed(
+            "shedding",
+            client.get(url, headers={"Authorization": f"Bearer {jwt_token}"}),
+        )
+        if r.status_code == 401:
+            # cached token was not accepted, authenticate again once
+            _LOGGER.debug("Enedis rejected our token, fetching a new one")
+            self._jwt_token = None
+            jwt_token = await self.async_jwt_token()
+            r = await client.get(
+                url,
+                headers={"Authorization": f"Bearer {jwt_token}"},
+            )
+        if not r.is_success:
+            _LOGGER.warn(f"Failure to fetch data from /v2/shedding: {r.text}")
+            _raise_for_status(r, "Failed fetching enedis data at step 3")
+        data = r.json()
+        if "ECOWATT_DEBUG" in os.environ:
+            # TODO: show a real example of shedding
+            data = {"success": True, "eld": False, "shedding": []}
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Data fetched from enedis: %s", _loggable_body(str(data)))
+        if not data["success"]:
+            raise UpdateFailed("Enedis API answered success: false at step 4")
+        for shedding_event in data["shedding"]:
+            shedding_event["start_date"] = parse_enedis_time(
+                shedding_event["start_date"]
+            )
+            shedding_event["stop_date"] = parse_enedis_time(shedding_event["stop_date"])
+            shedding_event["refresh_date"] = parse_enedis_time(
+                shedding_event["refresh_date"]
+            )
+        data["address"] = {"street": street, "insee_code": city_code}
+        return data
+
     async def update_method(self):
         """Fetch data from API endpoint."""
         try:
             _LOGGER.debug(
-                f"Calling update method, {len(self._listeners)} listeners subscribed"
+                "Calling update method, %d listeners subscribed", len(self._listeners)
             )
             if "ENEDIS_APIFAIL" in os.environ:
                 raise UpdateFailed(
                     "Failing update on purpose to test state restoration"
                 )
             _LOGGER.debug("Starting collecting data")
-            client = await self.async_client()
-
-            r = await client.get(
-                "https://megacache.p.web-enedis.fr/anon/v2/shedding/state_js"
-            )
-            if not r.is_success:
-                _LOGGER.warn(
-                    f"Failure to fetch data from /shedding/state_js endpoint: {r.text}"
-                )
-                raise UpdateFailed("Failed fetching enedis data at step 1")
-            match = re.search(r"^.+var xtick0\s*=\s*'(.+)'.*$", r.text)
-            if not match:
-                raise UpdateFailed(f"Impossible to find expected data in {r.text}")
-            step = match.groups()[0]
-
-            r = await client.post(
-                "https://megacache.p.web-enedis.fr/v2/g/trace", json={"step": step}
-            )
-            if not r.is_success:
-                _LOGGER.warn(
-                    f"Failure to fetch data from /v2/g/trace endpoint: {r.text}"
-                )
-                raise UpdateFailed("Failed fetching enedis data at step 2")
-            jwt_token = r.json()["token"]
-            _LOGGER.debug(f"Fetched token {jwt_token} from enedis api")
-
-            (street, city_code) = await self.fetch_street_and_insee_code()
-            encoded_street = urllib.parse.quote_plus(street)
-
-            url = f"https://megacache.p.web-enedis.fr/v2/shedding?street={encoded_street}&insee_code={city_code}"
-            _LOGGER.debug(f"Requesting shedding from {url}")
-            r = await client.get(
-                url,
-                headers={"Authorization": f"Bearer {jwt_token}"},
-            )
-            if not r.is_success:
-                _LOGGER.warn(f"Failure to fetch data from /v2/shedding: {r.text}")
-                raise UpdateFailed("Failed fetching enedis data at step 3")
-            data = r.json()
-            if "ECOWATT_DEBUG" in os.environ:
-                # TODO: show a real example of shedding
-                data = {"success": True, "eld": False, "shedding": []}
-            _LOGGER.debug(f"Data fetched from enedis: {data}")
-            if not data["success"]:
-                raise UpdateFailed("Enedis API answered success: false at step 4")
-            for shedding_event in data["shedding"]:
-                shedding_event["start_date"] = self._parse_enedis_time(
-                    shedding_event["start_date"]
-                )
-                shedding_event["stop_date"] = self._parse_enedis_time(
-                    shedding_event["stop_date"]
+            if not self.circuit_breaker.allow_request():
+                raise UpdateFailed(
+                    f"Enedis API failed repeatedly, next try at {self.circuit_breaker.retry_at}"
                 )
-                shedding_event["refresh_date"] = self._parse_enedis_time(
-                    shedding_event["refresh_date"]
+            try:
+                data = await async_retry(
+                    self._fetch_shedding,
+                    retry_on=(httpx.TransportError, TransientError),
                 )
-            data["address"] = {"street": street, "insee_code": city_code}
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            self.circuit_breaker.record_success()
             return data
         except Exception as err:
             raise UpdateFailed(f"Error communicating with API: {err}")
 
-    def _parse_enedis_time(self, time_string: str) -> datetime:
-        _LOGGER.debug(f"Trying to parse {time_string}")
-        try:
-            a = datetime.strptime(time_string, "%d/%m/%Y %H:%M")
-        except ValueError:
-            a = datetime.strptime(time_string, "%d/%m/%Y %H:%M:%S")
-        return datetime(
-            a.year,
-            a.month,
-            a.day,
-            a.hour,
-            a.minute,
-            a.second,
-            tzinfo=tz.gettz("Europe/Paris"),
-        )
-
 
 class ElectricityDistributorEntity(CoordinatorEntity, RestorableCoordinatedSensor):
     """Exposes type of electricity distribution (via Enedis or ELD)"""
 
-    def __init__(self, coordinator: EnedisAPICoordinator, hass: HomeAssistant):
+    def __init__(
+        self,
+        coordinator: EnedisAPICoordinator,
+        hass: HomeAssistant,
+        unique_id_suffix: str = "",
+    ):
         super().__init__(coordinator)
-        self._restored = False
         self.hass = hass
+        self._unique_id_suffix = unique_id_suffix
         self._attr_name = "Electricity distributor"
         self._state = None
         self._attr_extra_state_attributes: Dict[str, Any] = {}
@@ -637,7 +1407,7 @@ class ElectricityDistributorEntity(CoordinatorEntity, RestorableCoordinatedSenso
 
     @property
     def unique_id(self) -> str:
-        return f"enedis-electricity-distributor"
+        return f"enedis-electricity-distributor{self._unique_id_suffix}"
 
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -648,7 +1418,7 @@ class ElectricityDistributorEntity(CoordinatorEntity, RestorableCoordinatedSenso
             self._state = "Entreprise Locale de Distribution"
         else:
             self._state = "Enedis"
-        self.async_write_ha_state()
+        self._async_write_ha_state_if_changed()
 
     @property
     def state(self) -> Optional[str]:
@@ -659,18 +1429,27 @@ class ElectricityDistributorEntity(CoordinatorEntity, RestorableCoordinatedSenso
         return {"identifiers": {(DOMAIN, "enedis")}, "name": "Enedis"}
 
 
-class EnedisNextDowngradedPeriods(CoordinatorEntity, CalendarEntity):
+class EnedisNextDowngradedPeriods(
+    CoordinatorEntity, ChangeDetectingEntity, CalendarEntity
+):
     """Expose downgraded periods for Enedis"""
 
-    def __init__(self, coordinator: EnedisAPICoordinator, hass: HomeAssistant):
+    def __init__(
+        self,
+        coordinator: EnedisAPICoordinator,
+        hass: HomeAssistant,
+        unique_id_suffix: str = "",
+    ):
         CoordinatorEntity.__init__(self, coordinator)
         self.hass = hass
+        self._unique_id_suffix = unique_id_suffix
         self._attr_name = "Next load sheddings"
         self._events = []
+        self._event_index = CalendarEventIndex([])
 
     @property
     def unique_id(self) -> str:
-        return f"enedis-next-downgraded-periods"
+        return f"enedis-next-downgraded-periods{self._unique_id_suffix}"
 
     @property
     def event(self) -> Optional[CalendarEvent]:
@@ -681,16 +1460,7 @@ class EnedisNextDowngradedPeriods(CoordinatorEntity, CalendarEntity):
     async def async_get_events(
         self, hass: HomeAssistant, start_date: datetime, end_date: datetime
     ) -> list[CalendarEvent]:
-        relevant_events = []
-        for event in self._events:
-            included = event.start <= start_date and event.end >= end_date
-            included = included or (
-                event.start >= start_date and event.start <= end_date
-            )
-            included = included or (event.end >= start_date and event.end <= end_date)
-            if included:
-                relevant_events.append(event)
-        return relevant_events
+        return self._event_index.query(start_date, end_date)
 
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -704,7 +1474,7 @@ class EnedisNextDowngradedPeriods(CoordinatorEntity, CalendarEntity):
             return
 
         _LOGGER.debug(
-            f"Enedis returned {len(self.coordinator.data['shedding'])} shedding events"
+            "Enedis returned %d shedding events", len(self.coordinator.data["shedding"])
         )
         events = []
         for shedding_event in self.coordinator.data["shedding"]:
@@ -719,7 +1489,8 @@ class EnedisNextDowngradedPeriods(CoordinatorEntity, CalendarEntity):
         self._events = events
 
         self._events = self._merge_events(events)
-        self.async_write_ha_state()  # we probably don't need this line
+        self._event_index = CalendarEventIndex(self._events)
+        self._async_write_ha_state_if_changed()
 
     def _merge_events(self, events: list[CalendarEvent]) -> list[CalendarEvent]:
         events.sort(key=lambda e: e.start)
@@ -758,10 +1529,15 @@ async def async_migrate_entry(hass, config_entry: ConfigEntry):
 class DetectedAddress(CoordinatorEntity, RestorableCoordinatedSensor):
     """Exposes the address detected from GPS coordinate and sent to Enedis"""
 
-    def __init__(self, coordinator: EnedisAPICoordinator, hass: HomeAssistant):
+    def __init__(
+        self,
+        coordinator: EnedisAPICoordinator,
+        hass: HomeAssistant,
+        unique_id_suffix: str = "",
+    ):
         super().__init__(coordinator)
-        self._restored = False
         self.hass = hass
+        self._unique_id_suffix = unique_id_suffix
         self._attr_extra_state_attributes: Dict[str, Any] = {}
         self._attr_name = "Detected address"
         self._state = None
@@ -774,7 +1550,7 @@ class DetectedAddress(CoordinatorEntity, RestorableCoordinatedSensor):
             return
         data = self.coordinator.data["address"]
         self._state = f"{data['street']} {data['insee_code']}"
-        self.async_write_ha_state()
+        self._async_write_ha_state_if_changed()
 
     @property
     def state(self) -> Optional[str]:
@@ -791,4 +1567,53 @@ class DetectedAddress(CoordinatorEntity, RestorableCoordinatedSensor):
 
     @property
     def unique_id(self) -> str:
-        return f"enedis-sent-address"
+        return f"enedis-sent-address{self._unique_id_suffix}"
+
+
+class CircuitBreakerSensor(CoordinatorEntity, ChangeDetectingEntity, SensorEntity):
+    """Exposes whether we currently stop calling an api after repeated failures"""
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        hass: HomeAssistant,
+        api: str,
+        unique_id_suffix: str = "",
+    ):
+        super().__init__(coordinator)
+        self.hass = hass
+        self._unique_id_suffix = unique_id_suffix
+        self._api = api
+        self._attr_name = f"{api} API circuit breaker"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def unique_id(self) -> str:
+        return f"{self._api.lower()}-api-circuit-breaker{self._unique_id_suffix}"
+
+    @property
+    def available(self) -> bool:
+        # this sensor is precisely meant to describe failures
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._async_write_ha_state_if_changed()
+
+    @property
+    def state(self) -> str:
+        return self.coordinator.circuit_breaker.state
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        breaker = self.coordinator.circuit_breaker
+        return {
+            "consecutive_failures": breaker.failures,
+            "retry_at": breaker.retry_at.isoformat() if breaker.retry_at else None,
+        }
+
+    @property
+    def device_info(self):
+        if self._api == "RTE":
+            return {"identifiers": {(DOMAIN, "RTE")}, "name": "RTE"}
+        return {"identifiers": {(DOMAIN, "enedis")}, "name": "Enedis"}
@@ -13,6 +13,7 @@ from . import (
     EnedisAPICoordinator,
     DowngradedEcowattLevelCalendar,
     EnedisNextDowngradedPeriods,
+    entity_unique_id_suffix,
 )
 from .const import (
     DOMAIN,
@@ -28,12 +29,14 @@ async def async_setup_entry(
     _LOGGER.info("Called async setup entry for calendar")
     rte_coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
     enedis_coordinator = hass.data[DOMAIN][entry.entry_id]["enedis_coordinator"]
+    # entries sharing a credential with another one need distinct unique ids
+    suffix = entity_unique_id_suffix(entry)
     sensors = []
-    sensors.append(DowngradedEcowattLevelCalendar(rte_coordinator, hass))
+    sensors.append(DowngradedEcowattLevelCalendar(rte_coordinator, hass, suffix))
     if entry.data[CONF_ENEDIS_LOAD_SHEDDING][
         0
     ]:  # this sensor transmit PII to external provider, it's opt-in
-        sensors.append(EnedisNextDowngradedPeriods(enedis_coordinator, hass))
+        sensors.append(EnedisNextDowngradedPeriods(enedis_coordinator, hass, suffix))
 
     async_add_entities(sensors)
 
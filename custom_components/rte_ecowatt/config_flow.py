@@ -16,6 +16,10 @@ from .const import (
     CONF_ENEDIS_LOAD_SHEDDING,
     CONF_SENSOR_UNIT,
     CONF_SENSOR_SHIFT,
+    CONF_STARTUP_MAX_WAIT,
+    DEFAULT_STARTUP_MAX_WAIT,
+    CONF_MAX_STALENESS,
+    DEFAULT_MAX_STALENESS_MINUTES,
 )
 from . import AsyncOauthClient
 
@@ -43,7 +47,10 @@ class SetupConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             _LOGGER.debug("Testing connectivity to RTE api")
             try:
                 test_client = AsyncOauthClient(user_input)
-                await test_client.client()
+                try:
+                    await test_client.client()
+                finally:
+                    await test_client.async_close()
                 valid = True
             except rfc6749.errors.InvalidClientError:
                 _LOGGER.error(
@@ -84,10 +91,19 @@ class SetupConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: Optional[dict[str, Any]] = None
     ):
         _LOGGER.info(f"Configuration from user is finished, input is {self.user_input}")
-        await self.async_set_unique_id(self.user_input[CONF_CLIENT_ID])
+        # several entries may use one credential, only the first one keeps client id as unique id
+        client_id = self.user_input[CONF_CLIENT_ID]
+        taken = {entry.unique_id for entry in self._async_current_entries()}
+        unique_id = client_id
+        instance = 1
+        while unique_id in taken:
+            instance += 1
+            unique_id = f"{client_id}-{instance}"
+        await self.async_set_unique_id(unique_id)
         self._abort_if_unique_id_configured()
         # will call async_setup_entry defined in __init__.py file
-        return self.async_create_entry(title="ecowatt by RTE", data=self.user_input)
+        title = "ecowatt by RTE" if instance == 1 else f"ecowatt by RTE ({instance})"
+        return self.async_create_entry(title=title, data=self.user_input)
 
     @staticmethod
     @callback
@@ -111,9 +127,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         """Manage the options."""
 
         if self.user_input is None:  # done once, feed user_input with existing sensors
-            self.user_input: dict[
-                str, Any
-            ] = self.config_entry.data  # casting is a bit brutal but works
+            # entry data is read only, sensor lists are still edited in place
+            self.user_input: dict[str, Any] = dict(self.config_entry.data)
+            # top-level settings are saved in options by a previous options flow
+            for key in (CONF_STARTUP_MAX_WAIT, CONF_MAX_STALENESS):
+                if key in self.config_entry.options:
+                    self.user_input[key] = self.config_entry.options[key]
 
         return self._configuration_menu("init")
 
@@ -125,6 +144,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 "configure_hours_sensor",
                 "configure_days_sensor",
                 "enable_load_shedding_announcements",
+                "configure_startup_max_wait",
+                "configure_max_staleness",
             ],
         )
 
@@ -146,6 +167,52 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             errors=errors,
         )
 
+    async def async_step_configure_startup_max_wait(
+        self, user_input: Optional[dict[str, Any]] = None
+    ):
+        step_name = "configure_startup_max_wait"
+        errors = {}
+        data_schema = {
+            vol.Required(
+                CONF_STARTUP_MAX_WAIT,
+                default=self.user_input.get(
+                    CONF_STARTUP_MAX_WAIT, DEFAULT_STARTUP_MAX_WAIT
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=300)),
+        }
+        if user_input is not None:
+            self.user_input[CONF_STARTUP_MAX_WAIT] = user_input[CONF_STARTUP_MAX_WAIT]
+            return self._configuration_menu(step_name)
+
+        return self.async_show_form(
+            step_id=step_name,
+            data_schema=vol.Schema(data_schema),
+            errors=errors,
+        )
+
+    async def async_step_configure_max_staleness(
+        self, user_input: Optional[dict[str, Any]] = None
+    ):
+        step_name = "configure_max_staleness"
+        errors = {}
+        data_schema = {
+            vol.Required(
+                CONF_MAX_STALENESS,
+                default=self.user_input.get(
+                    CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS_MINUTES
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=16, max=24 * 60)),
+        }
+        if user_input is not None:
+            self.user_input[CONF_MAX_STALENESS] = user_input[CONF_MAX_STALENESS]
+            return self._configuration_menu(step_name)
+
+        return self.async_show_form(
+            step_id=step_name,
+            data_schema=vol.Schema(data_schema),
+            errors=errors,
+        )
+
     async def async_step_finish_configuration(
         self, user_input: Optional[dict[str, Any]] = None
     ):
@@ -156,14 +223,15 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     async def async_step_configure_hours_sensor(
         self, user_input: Optional[dict[str, Any]] = None
     ):
+        # shift 0 is the "now" and "today" sensors, always created
         return self._manual_configuration_step(
-            "hours", vol.In(range(3 * 24)), user_input
+            "hours", vol.In(range(1, 3 * 24)), user_input
         )
 
     async def async_step_configure_days_sensor(
         self, user_input: Optional[dict[str, Any]] = None
     ):
-        return self._manual_configuration_step("days", vol.In(range(4)), user_input)
+        return self._manual_configuration_step("days", vol.In(range(1, 4)), user_input)
 
     def _manual_configuration_step(
         self, sensor_unit, validator, user_input: Optional[dict[str, Any]] = None
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 DOMAIN = "rte_ecowatt"
 CONF_CLIENT_ID = "api_client_id"
 CONF_CLIENT_SECRET = "api_client_secret"
@@ -5,11 +7,63 @@ CONF_ENEDIS_LOAD_SHEDDING = "enedis_load_shedding"
 CONF_SENSORS = "sensors"
 CONF_SENSOR_UNIT = "unit"
 CONF_SENSOR_SHIFT = "shift"
+CONF_STARTUP_MAX_WAIT = "startup_max_wait"
+CONF_MAX_STALENESS = "max_staleness"
+
+# seconds platform setup waits for first refreshes before letting them finish in background
+DEFAULT_STARTUP_MAX_WAIT = 5
 
 BASE_URL = "https://digital.iservices.rte-france.com"
 TOKEN_URL = f"{BASE_URL}/token/oauth/"
+# seconds before expiry at which a cached token is considered stale
+TOKEN_EXPIRY_MARGIN = 60
+# connections kept alive to RTE api (token + signals endpoints)
+HTTP_POOL_SIZE = 2
+# payload size in debug logs when ECOWATT_LOG_BODY=truncate
+LOG_BODY_MAX_LENGTH = 1000
+
+STORAGE_VERSION = 1
+TOKEN_STORAGE_KEY = DOMAIN + ".token.{client_id}"
+SIGNALS_STORAGE_KEY = DOMAIN + ".signals.{client_id}"
+RATE_LIMIT_STORAGE_KEY = DOMAIN + ".rate_limit.{client_id}"
+ADDRESS_STORAGE_KEY = DOMAIN + ".address"
+MAINTENANCE_STORAGE_KEY = DOMAIN + ".maintenance_windows"
+# decimals of latitude/longitude used to detect a move of HA instance
+ADDRESS_CACHE_PRECISION = 4
+
+# RTE allows one call to signals endpoint every 15 minutes
+RTE_QUOTA_WINDOW = timedelta(minutes=15)
+# refresh interval used around expected RTE publications, or when none has been observed yet
+DEFAULT_RTE_UPDATE_INTERVAL = RTE_QUOTA_WINDOW + timedelta(minutes=1)
+# after a failed refresh, RTE is called again as soon as quota allows, plus a jittered
+# delay growing with consecutive failures
+RTE_RETRY_BASE_DELAY = timedelta(minutes=1)
+RTE_RETRY_MAX_DELAY = timedelta(minutes=30)
+# longest interval between two refreshes outside of expected publications
+DEFAULT_MAX_STALENESS_MINUTES = 120
+# planned RTE API maintenances known at release time, more are added with a service
+RTE_MAINTENANCE_WINDOWS = [
+    ("2022-11-30T04:15:00+01:00", "2022-11-30T05:15:00+01:00"),
+    ("2022-12-06T04:15:00+01:00", "2022-12-06T05:15:00+01:00"),
+]
+SERVICE_ADD_MAINTENANCE_WINDOW = "add_maintenance_window"
+# maximum time platform setup waits for sensors to restore their state
+RESTORE_TIMEOUT = timedelta(seconds=30)
 
 ATTR_LEVEL_CODE = "level_code"
 ATTR_GENERATION_TIME = "generation_time"
 ATTR_PERIOD_START = "period_start"
 ATTR_PERIOD_END = "period_end"
+ATTR_HOURLY_LEVELS = "hourly_levels"
+ATTR_DAILY_LEVELS = "daily_levels"
+
+# attributes changing at least every hour, kept out of recorder database
+UNRECORDED_ATTRIBUTES = frozenset(
+    {
+        ATTR_GENERATION_TIME,
+        ATTR_PERIOD_START,
+        ATTR_PERIOD_END,
+        ATTR_HOURLY_LEVELS,
+        ATTR_DAILY_LEVELS,
+    }
+)
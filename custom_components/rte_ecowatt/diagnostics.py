@@ -0,0 +1,42 @@
+"""Diagnostics support for rte_ecowatt"""
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_CLIENT_SECRET, DOMAIN
+
+TO_REDACT = {CONF_CLIENT_SECRET}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    rte_coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
+    enedis_coordinator = hass.data[DOMAIN][entry.entry_id]["enedis_coordinator"]
+    oauth_client = rte_coordinator.oauth_client
+    return {
+        "config": async_redact_data(dict(entry.data), TO_REDACT),
+        "rte": {
+            "token_cache_hits": oauth_client.token_cache_hits,
+            "token_cache_misses": oauth_client.token_cache_misses,
+            "http": oauth_client.connection_stats(),
+            "last_request": rte_coordinator.rate_limiter.last_request,
+            "next_allowed_fetch": rte_coordinator.rate_limiter.next_allowed,
+            "skipped_state_writes": rte_coordinator.skipped_state_writes,
+            # volatile attributes are not recorded, expose them here instead
+            "generation_time": rte_coordinator.data.generation_time
+            if rte_coordinator.data is not None
+            else None,
+            "last_fetch_time": rte_coordinator.last_fetch_time,
+            "fingerprint": rte_coordinator.fingerprint,
+            "data_version": rte_coordinator.data_version,
+            "circuit_breaker": rte_coordinator.circuit_breaker.state,
+        },
+        "enedis": {
+            "skipped_state_writes": enedis_coordinator.skipped_state_writes,
+            "step_durations": enedis_coordinator.step_durations,
+            "circuit_breaker": enedis_coordinator.circuit_breaker.state,
+        },
+    }
@@ -0,0 +1,44 @@
+"""Fast lookup of calendar events overlapping a time window"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from homeassistant.components.calendar import CalendarEvent
+
+# number of distinct windows for which we keep the answer
+MAX_CACHED_QUERIES = 64
+
+
+class CalendarEventIndex:
+    """
+    Keeps events sorted by start date to answer overlap queries with bisect.
+    Events may overlap each other: the running maximum of end dates is monotonic,
+    which lets us find the first event that can still be running at a given date.
+    Answers are cached per window until the index is rebuilt
+    """
+
+    def __init__(self, events: List[CalendarEvent]):
+        self.events = sorted(events, key=lambda e: e.start)
+        self._starts = [event.start for event in self.events]
+        self._max_ends = []
+        max_end = None
+        for event in self.events:
+            max_end = event.end if max_end is None else max(max_end, event.end)
+            self._max_ends.append(max_end)
+        self._cache: Dict[Tuple[datetime, datetime], List[CalendarEvent]] = {}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def query(self, start_date: datetime, end_date: datetime) -> List[CalendarEvent]:
+        """Returns events overlapping [start_date, end_date], bounds included"""
+        key = (start_date, end_date)
+        if key in self._cache:
+            return list(self._cache[key])
+        first = bisect_left(self._max_ends, start_date)
+        last = bisect_right(self._starts, end_date)
+        result = [event for event in self.events[first:last] if event.end >= start_date]
+        if len(self._cache) >= MAX_CACHED_QUERIES:
+            self._cache.clear()
+        self._cache[key] = result
+        return list(result)
@@ -0,0 +1,86 @@
+"""Compact, immutable representation of ecowatt signals returned by RTE"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .parsing import parse_rte_time
+
+# marks an hour for which RTE did not send any level
+NO_LEVEL = 0xFF
+
+
+@dataclass(frozen=True)
+class EcowattDay:
+    """Levels for a single day, hourly levels are stored as 24 bytes indexed by hour"""
+
+    __slots__ = (
+        "date",
+        "start",
+        "generation_time",
+        "level",
+        "message",
+        "hourly_levels",
+    )
+
+    date: date
+    start: datetime
+    generation_time: str
+    level: int
+    message: str
+    hourly_levels: bytes
+
+    @classmethod
+    def from_signal(cls, signal: dict) -> "EcowattDay":
+        start = parse_rte_time(signal["jour"])
+        levels = bytearray([NO_LEVEL] * 24)
+        for hour in signal["values"]:
+            levels[hour["pas"]] = hour["hvalue"]
+        return cls(
+            date=start.date(),
+            start=start,
+            generation_time=signal["GenerationFichier"],
+            level=signal["dvalue"],
+            message=signal.get("message", ""),
+            hourly_levels=bytes(levels),
+        )
+
+    def hourly_level(self, hour: int) -> Optional[int]:
+        level = self.hourly_levels[hour]
+        return None if level == NO_LEVEL else level
+
+
+class EcowattForecast:
+    """All days sent by RTE, with O(1) lookup by date"""
+
+    __slots__ = ("days", "_positions")
+
+    def __init__(self, days: Tuple[EcowattDay, ...]):
+        self.days = days
+        self._positions: Dict[date, int] = {
+            day.date: position for position, day in enumerate(days)
+        }
+
+    @classmethod
+    def from_signals(cls, signals: List[dict]) -> "EcowattForecast":
+        return cls(tuple(EcowattDay.from_signal(signal) for signal in signals))
+
+    def __iter__(self) -> Iterator[EcowattDay]:
+        return iter(self.days)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __repr__(self) -> str:
+        return f"EcowattForecast({list(self.days)})"
+
+    @property
+    def generation_time(self) -> Optional[str]:
+        return self.days[0].generation_time if self.days else None
+
+    def day(self, day: date) -> Optional[EcowattDay]:
+        position = self._positions.get(day)
+        return None if position is None else self.days[position]
+
+    def hourly_level(self, day: date, hour: int) -> Optional[int]:
+        ecowatt_day = self.day(day)
+        return None if ecowatt_day is None else ecowatt_day.hourly_level(hour)
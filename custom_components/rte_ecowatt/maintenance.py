@@ -0,0 +1,73 @@
+"""Planned RTE API maintenance windows, during which refreshes are skipped"""
+import bisect
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import STORAGE_VERSION, MAINTENANCE_STORAGE_KEY, RTE_MAINTENANCE_WINDOWS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MaintenanceRegistry:
+    """
+    Keeps maintenance windows as disjoint intervals sorted by start, as timestamps,
+    so that checking the current time is a bisection without allocating anything
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._starts: List[float] = []
+        self._ends: List[float] = []
+        self._store = Store(hass, STORAGE_VERSION, MAINTENANCE_STORAGE_KEY)
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if stored is None:
+            windows = [
+                (
+                    datetime.fromisoformat(start).timestamp(),
+                    datetime.fromisoformat(end).timestamp(),
+                )
+                for (start, end) in RTE_MAINTENANCE_WINDOWS
+            ]
+        else:
+            windows = [tuple(window) for window in stored["windows"]]
+        self._set(windows)
+
+    def window_end(self, timestamp: float) -> Optional[float]:
+        """Returns end of the window containing timestamp, None outside of maintenance"""
+        index = bisect.bisect_right(self._starts, timestamp) - 1
+        if index >= 0 and timestamp < self._ends[index]:
+            return self._ends[index]
+        return None
+
+    async def async_add(self, start: float, end: float) -> None:
+        if end <= start:
+            raise ValueError("Maintenance window must end after it starts")
+        self._set(list(zip(self._starts, self._ends)) + [(start, end)])
+        _LOGGER.info(
+            f"Added RTE API maintenance window from {datetime.fromtimestamp(start)} to {datetime.fromtimestamp(end)}"
+        )
+        await self._store.async_save(
+            {"windows": [list(window) for window in zip(self._starts, self._ends)]}
+        )
+
+    def _set(self, windows) -> None:
+        """Merges overlapping windows and forgets the ones already over"""
+        now = time.time()
+        starts: List[float] = []
+        ends: List[float] = []
+        for (start, end) in sorted(windows):
+            if end <= now:
+                continue
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts = starts
+        self._ends = ends
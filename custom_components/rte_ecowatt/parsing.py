@@ -0,0 +1,48 @@
+"""Fast parsing of timestamps sent by RTE and Enedis apis"""
+from datetime import datetime
+from functools import lru_cache
+
+from dateutil import tz
+
+# Enedis sends local times without offset
+PARIS_TZ = tz.gettz("Europe/Paris")
+
+
+@lru_cache(maxsize=64)
+def parse_rte_time(value: str) -> datetime:
+    """Parses times such as 2022-06-03T00:00:00+02:00"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    if parsed.tzinfo is None:
+        # fromisoformat accepts dates without offset, RTE always sends one
+        raise ValueError(f"Missing UTC offset in {value}")
+    return parsed
+
+
+@lru_cache(maxsize=256)
+def parse_enedis_time(value: str) -> datetime:
+    """Parses times such as 03/06/2022 08:00 or 03/06/2022 08:00:00, in Paris timezone"""
+    try:
+        (day, time_of_day) = value.split(" ")
+        (d, m, y) = day.split("/")
+        parts = time_of_day.split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Unexpected time format: {value}")
+        return datetime(
+            int(y),
+            int(m),
+            int(d),
+            int(parts[0]),
+            int(parts[1]),
+            int(parts[2]) if len(parts) == 3 else 0,
+            tzinfo=PARIS_TZ,
+        )
+    except ValueError:
+        # unusual formatting (extra spaces, ...), let strptime decide
+        try:
+            parsed = datetime.strptime(value, "%d/%m/%Y %H:%M")
+        except ValueError:
+            parsed = datetime.strptime(value, "%d/%m/%Y %H:%M:%S")
+        return parsed.replace(tzinfo=PARIS_TZ)
@@ -0,0 +1,99 @@
+"""Keeps calls to RTE signals endpoint within the quota allowed by RTE"""
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import STORAGE_VERSION, RATE_LIMIT_STORAGE_KEY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[timedelta]:
+    """Parses a Retry-After header, which is either a number of seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return timedelta(seconds=max(0, int(value)))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        _LOGGER.debug(f"Ignoring unparsable Retry-After header: {value}")
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(timedelta(0), retry_at - datetime.now(timezone.utc))
+
+
+class RteRateLimiter:
+    """
+    Token bucket holding a single token, refilled once per quota window.
+    The time of the last request is persisted so the quota survives reloads and restarts
+    """
+
+    def __init__(self, hass: HomeAssistant, client_id: str, window: timedelta):
+        self.window = window
+        self.last_request: Optional[datetime] = None
+        self.next_allowed: Optional[datetime] = None
+        self._previous: Tuple[Optional[datetime], Optional[datetime]] = (None, None)
+        self._store = Store(
+            hass, STORAGE_VERSION, RATE_LIMIT_STORAGE_KEY.format(client_id=client_id)
+        )
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        if stored.get("last_request"):
+            self.last_request = datetime.fromisoformat(stored["last_request"])
+        if stored.get("next_allowed"):
+            self.next_allowed = datetime.fromisoformat(stored["next_allowed"])
+
+    def can_request(self) -> bool:
+        return (
+            self.next_allowed is None or datetime.now(timezone.utc) >= self.next_allowed
+        )
+
+    def time_until_allowed(self) -> timedelta:
+        if self.can_request():
+            return timedelta(0)
+        return self.next_allowed - datetime.now(timezone.utc)
+
+    async def async_record_request(self) -> None:
+        """Consumes the token, must be called right before calling the endpoint"""
+        self._previous = (self.last_request, self.next_allowed)
+        self.last_request = datetime.now(timezone.utc)
+        self.next_allowed = self.last_request + self.window
+        await self._async_save()
+
+    async def async_release_request(self) -> None:
+        """Gives the token back when the last request could not even reach RTE"""
+        self.last_request, self.next_allowed = self._previous
+        await self._async_save()
+
+    async def async_record_rejection(self, retry_after: Optional[timedelta]) -> None:
+        """Called when RTE answered 429, honours the delay it asked for"""
+        now = datetime.now(timezone.utc)
+        delay = max(self.window, retry_after or timedelta(0))
+        self.next_allowed = max(self.next_allowed or now, now + delay)
+        _LOGGER.warning(
+            f"RTE API asked us to slow down, next call allowed at {self.next_allowed}"
+        )
+        await self._async_save()
+
+    async def _async_save(self) -> None:
+        await self._store.async_save(
+            {
+                "last_request": self.last_request.isoformat()
+                if self.last_request
+                else None,
+                "next_allowed": self.next_allowed.isoformat()
+                if self.next_allowed
+                else None,
+            }
+        )
@@ -0,0 +1,10 @@
+"""Recorder platform for rte_ecowatt"""
+from homeassistant.core import HomeAssistant, callback
+
+from .const import UNRECORDED_ATTRIBUTES
+
+
+@callback
+def exclude_attributes(hass: HomeAssistant) -> set[str]:
+    """Attributes changing every hour are not stored in recorder database"""
+    return set(UNRECORDED_ATTRIBUTES)
@@ -0,0 +1,115 @@
+"""Retries with backoff and circuit breaker shared by RTE and Enedis coordinators"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class TransientError(Exception):
+    """A failure likely to disappear if we try again shortly (5xx answer, ...)"""
+
+
+async def async_retry(
+    func: Callable[[], Awaitable[T]],
+    retry_on: Tuple[Type[BaseException], ...],
+    attempts: int = 3,
+    base_delay: float = 2.0,
+    max_delay: float = 30.0,
+) -> T:
+    """
+    Calls func until it succeeds, at most attempts times, sleeping between attempts
+    with exponential backoff and full jitter. Only exceptions listed in retry_on are retried
+    """
+    for attempt in range(attempts):
+        try:
+            return await func()
+        except retry_on as err:
+            if attempt == attempts - 1:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2**attempt))
+            _LOGGER.debug(
+                "Attempt %d failed (%s), retrying in %.1fs", attempt + 1, err, delay
+            )
+            await asyncio.sleep(delay)
+    raise RuntimeError("async_retry called with attempts < 1")
+
+
+def jittered_backoff(attempt: int, base: timedelta, maximum: timedelta) -> timedelta:
+    """
+    Delay doubling with each attempt (starting at 0) up to maximum, half of it random
+    so that clients failing together do not retry together
+    """
+    delay = min(maximum.total_seconds(), base.total_seconds() * 2**attempt)
+    return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+
+class CircuitBreaker:
+    """
+    Stops calling an api after failure_threshold consecutive failed refreshes.
+    After reset_timeout, a single refresh is allowed (half open): its success closes
+    the circuit, its failure opens it again for twice as long, up to max_reset_timeout
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: timedelta = timedelta(minutes=30),
+        max_reset_timeout: timedelta = timedelta(hours=8),
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[datetime] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return STATE_CLOSED
+        if datetime.now(timezone.utc) >= self.retry_at:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    @property
+    def retry_at(self) -> Optional[datetime]:
+        if self.opened_at is None:
+            return None
+        return self.opened_at + self.reset_timeout
+
+    def allow_request(self) -> bool:
+        return self.state != STATE_OPEN
+
+    def time_until_allowed(self) -> timedelta:
+        if self.allow_request():
+            return timedelta(0)
+        return self.retry_at - datetime.now(timezone.utc)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            # api is still down, leave it alone longer
+            self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+            self._open()
+        elif self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.opened_at = datetime.now(timezone.utc)
+        _LOGGER.warning(
+            f"Opening circuit after {self.failures} failures, next try at {self.retry_at}"
+        )
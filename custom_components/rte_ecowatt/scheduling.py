@@ -0,0 +1,63 @@
+"""Adapts RTE refresh interval to the times at which RTE publishes new signals"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from .parsing import PARIS_TZ
+
+MINUTES_PER_DAY = 24 * 60
+# number of publications remembered to learn the pattern
+MAX_HISTORY = 30
+# publication times are grouped in buckets of this many minutes
+BUCKET_MINUTES = 15
+# poll densely from a bit before an expected publication to well after it (it may be late)
+WINDOW_BEFORE = timedelta(minutes=15)
+WINDOW_AFTER = timedelta(minutes=60)
+
+
+class PublicationScheduler:
+    """
+    Learns at which times of day RTE publishes new files (from GenerationFichier)
+    and polls densely around them, backing off the rest of the time
+    """
+
+    def __init__(
+        self,
+        min_interval: timedelta,
+        max_staleness: timedelta,
+        history: Optional[List[int]] = None,
+    ):
+        self.min_interval = min_interval
+        self.max_staleness = max(min_interval, max_staleness)
+        # minutes since midnight (Paris time) of observed publications
+        self.history: List[int] = list(history or [])[-MAX_HISTORY:]
+        self._last_generation_time: Optional[datetime] = None
+
+    def record(self, generation_time: datetime) -> None:
+        if generation_time == self._last_generation_time:
+            return
+        self._last_generation_time = generation_time
+        local = generation_time.astimezone(PARIS_TZ)
+        self.history.append(local.hour * 60 + local.minute)
+        del self.history[:-MAX_HISTORY]
+
+    def expected_publications(self) -> List[int]:
+        """Returns start of buckets (minutes since midnight) in which RTE published"""
+        return sorted({minute - minute % BUCKET_MINUTES for minute in self.history})
+
+    def next_interval(self, now: datetime) -> timedelta:
+        expected = self.expected_publications()
+        if not expected:
+            return self.min_interval
+        local = now.astimezone(PARIS_TZ)
+        minute = local.hour * 60 + local.minute
+        before = int(WINDOW_BEFORE.total_seconds() // 60)
+        after = int(WINDOW_AFTER.total_seconds() // 60)
+        wait = MINUTES_PER_DAY
+        for publication in expected:
+            window_start = publication - before
+            # minutes elapsed since window start, in [0, MINUTES_PER_DAY)
+            elapsed = (minute - window_start) % MINUTES_PER_DAY
+            if elapsed <= before + after + BUCKET_MINUTES:
+                return self.min_interval
+            wait = min(wait, MINUTES_PER_DAY - elapsed)
+        return min(self.max_staleness, max(self.min_interval, timedelta(minutes=wait)))
@@ -1,5 +1,5 @@
 import voluptuous as vol
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, timezone
 from typing import Optional
 import logging
 import asyncio
@@ -11,14 +11,17 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.entity import EntityPlatformState
 from homeassistant.config_entries import ConfigEntry
 
 from . import (
     HourlyEcowattLevel,
     DailyEcowattLevel,
+    EcowattForecastSensor,
     ElectricityDistributorEntity,
     DetectedAddress,
+    CircuitBreakerSensor,
+    entity_unique_id_suffix,
+    entry_setting,
 )
 from .const import (
     DOMAIN,
@@ -28,6 +31,10 @@ from .const import (
     CONF_SENSOR_UNIT,
     CONF_SENSOR_SHIFT,
     CONF_SENSORS,
+    RTE_QUOTA_WINDOW,
+    RESTORE_TIMEOUT,
+    CONF_STARTUP_MAX_WAIT,
+    DEFAULT_STARTUP_MAX_WAIT,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -57,9 +64,12 @@ async def async_setup_entry(
     _LOGGER.info("Called async setup entry")
     rte_coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
     enedis_coordinator = hass.data[DOMAIN][entry.entry_id]["enedis_coordinator"]
+    # entries sharing a credential with another one need distinct unique ids
+    suffix = entity_unique_id_suffix(entry)
     sensors = []
-    sensors.append(DailyEcowattLevel(rte_coordinator, 0, hass))
-    sensors.append(HourlyEcowattLevel(rte_coordinator, 0, hass))
+    sensors.append(DailyEcowattLevel(rte_coordinator, 0, hass, suffix))
+    sensors.append(HourlyEcowattLevel(rte_coordinator, 0, hass, suffix))
+    sensors.append(EcowattForecastSensor(rte_coordinator, hass, suffix))
 
     for sensor_config in entry.data[CONF_SENSORS]:
         if sensor_config[CONF_SENSOR_UNIT] == "days":
@@ -68,38 +78,74 @@ async def async_setup_entry(
             klass = HourlyEcowattLevel
         else:
             raise Exception("Unknown sensor unit type")
-        sensors.append(klass(rte_coordinator, sensor_config[CONF_SENSOR_SHIFT], hass))
+        if sensor_config[CONF_SENSOR_SHIFT] == 0:
+            # configured before the options flow refused it, same as default sensors
+            _LOGGER.debug(f"Ignoring configured sensor {sensor_config}")
+            continue
+        sensors.append(
+            klass(rte_coordinator, sensor_config[CONF_SENSOR_SHIFT], hass, suffix)
+        )
 
     if entry.data[CONF_ENEDIS_LOAD_SHEDDING][
         0
     ]:  # this sensor transmit PII to external provider, it's opt-in
-        sensors.append(ElectricityDistributorEntity(enedis_coordinator, hass))
-        sensors.append(DetectedAddress(enedis_coordinator, hass))
+        sensors.append(ElectricityDistributorEntity(enedis_coordinator, hass, suffix))
+        sensors.append(DetectedAddress(enedis_coordinator, hass, suffix))
 
-    async_add_entities(sensors)
-    while not all(
-        s.restored for s in sensors if s._platform_state == EntityPlatformState.ADDED
-    ):
-        _LOGGER.debug(f"Wait for all {len(sensors)} sensors to have been restored")
-        await asyncio.sleep(0.2)
-    _LOGGER.debug("All sensors have been restored properly")
+    # diagnostic sensors have no state to restore
+    breakers = [CircuitBreakerSensor(rte_coordinator, hass, "RTE", suffix)]
+    if entry.data[CONF_ENEDIS_LOAD_SHEDDING][0]:
+        breakers.append(
+            CircuitBreakerSensor(enedis_coordinator, hass, "Enedis", suffix)
+        )
+
+    async_add_entities(sensors + breakers)
+    _LOGGER.debug(f"Wait for all {len(sensors)} sensors to have been restored")
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(s.async_wait_restored() for s in sensors)),
+            RESTORE_TIMEOUT.total_seconds(),
+        )
+        _LOGGER.debug("All sensors have been restored properly")
+    except asyncio.TimeoutError:
+        _LOGGER.warning(
+            f"Some sensors were not restored after {RESTORE_TIMEOUT}, continuing setup"
+        )
 
     # we declare update_interval after initialization to avoid a first refresh before we setup entities
-    rte_coordinator.update_interval = timedelta(minutes=16)
+    rte_coordinator.update_interval = rte_coordinator.scheduler.next_interval(
+        datetime.now(timezone.utc)
+    )
     enedis_coordinator.update_interval = timedelta(hours=1)
+    # first refreshes run in background, entities show restored state until data arrives
+    first_refreshes = []
     if entry.data[CONF_ENEDIS_LOAD_SHEDDING][0]:
         # force a first refresh immediately to avoid waiting for 1 hour
-        await enedis_coordinator.async_config_entry_first_refresh()
-        enedis_coordinator._schedule_refresh()
-    # force a first refresh immediately to avoid waiting for 16 minutes
-    if any(
-        s.state is None for s in sensors if s.coordinator == rte_coordinator
-    ):  # one sensor needs immediate refresh
-        await rte_coordinator.async_config_entry_first_refresh()
-    else:
-        # it means we might not get up to date info if HA was stopped for a while. TODO: detect last refresh for each sensor to take the best decision
+        first_refreshes.append(
+            hass.async_create_task(enedis_coordinator.async_refresh())
+        )
+    # force a first refresh immediately unless cached data is recent enough
+    data_age = rte_coordinator.cached_data_age()
+    if data_age is not None and data_age <= RTE_QUOTA_WINDOW:
+        _LOGGER.info(
+            f"Cached data is only {data_age} old, we'll wait next refresh to avoid hitting API limit after a restart"
+        )
+        rte_coordinator._schedule_refresh()
+    elif not rte_coordinator.rate_limiter.can_request():
         _LOGGER.info(
-            "All sensors have already a known state, we'll wait next refresh to avoid hitting API limit after a restart"
+            f"RTE API was called recently, next refresh will happen at {rte_coordinator.rate_limiter.next_allowed}"
         )
+        rte_coordinator.async_defer_refresh()
         rte_coordinator._schedule_refresh()
+    else:
+        first_refreshes.append(hass.async_create_task(rte_coordinator.async_refresh()))
+
+    max_wait = entry_setting(entry, CONF_STARTUP_MAX_WAIT, DEFAULT_STARTUP_MAX_WAIT)
+    if first_refreshes and max_wait > 0:
+        # refreshes are not cancelled when we stop waiting for them
+        _, pending = await asyncio.wait(first_refreshes, timeout=max_wait)
+        if pending:
+            _LOGGER.info(
+                f"{len(pending)} first refresh(es) still running after {max_wait}s, finishing setup anyway"
+            )
     _LOGGER.info("We finished the setup of ecowatt *entity*")
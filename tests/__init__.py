@@ -0,0 +1 @@
+"""Tests for rte_ecowatt integration"""
@@ -0,0 +1,127 @@
+"""Helpers shared by tests and benchmarks"""
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from unittest.mock import AsyncMock, patch
+
+from homeassistant import config_entries, data_entry_flow
+from homeassistant.components.recorder.db_schema import StateAttributes, States
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.config_entries import ConfigEntry
+
+from custom_components.rte_ecowatt import AsyncOauthClient, EcoWattAPICoordinator
+from custom_components.rte_ecowatt.const import (
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_ENEDIS_LOAD_SHEDDING,
+    CONF_SENSORS,
+    CONF_SENSOR_SHIFT,
+    CONF_SENSOR_UNIT,
+    DOMAIN,
+)
+from custom_components.rte_ecowatt.parsing import PARIS_TZ
+
+# level changes every hour
+ALTERNATING_LEVELS = [3 if hour % 2 == 0 else 1 for hour in range(24)]
+
+
+def entry_data(
+    client_id: str = "client-id", sensors: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    return {
+        CONF_CLIENT_ID: client_id,
+        CONF_CLIENT_SECRET: "secret",
+        CONF_ENEDIS_LOAD_SHEDDING: [False],
+        CONF_SENSORS: sensors or [],
+    }
+
+
+def hourly_sensors(count: int) -> List[Dict[str, Any]]:
+    """Configured sensors, shift 0 is always created and cannot be configured twice"""
+    return [
+        {CONF_SENSOR_UNIT: "hours", CONF_SENSOR_SHIFT: shift}
+        for shift in range(1, count + 1)
+    ]
+
+
+def signals_body(
+    level: int = 1, days: int = 4, hourly_levels: Optional[List[int]] = None
+) -> str:
+    """
+    Payload shaped like RTE signals endpoint answer, starting today in Paris.
+    hourly_levels, if given, is the level of each hour of every day
+    """
+    hourly_levels = hourly_levels or [level] * 24
+    today = datetime.now(PARIS_TZ).replace(hour=0, minute=0, second=0, microsecond=0)
+    generation = today.isoformat()
+    signals = [
+        {
+            "GenerationFichier": generation,
+            "jour": (today + timedelta(days=shift)).isoformat(),
+            "dvalue": level,
+            "message": "Situation normale.",
+            "values": [
+                {"pas": hour, "hvalue": hourly_levels[hour]} for hour in range(24)
+            ],
+        }
+        for shift in range(days)
+    ]
+    return json.dumps({"signals": signals})
+
+
+def patch_rte_api(body: str):
+    """Serves body as RTE signals without any network access"""
+    fetch = patch.object(
+        EcoWattAPICoordinator, "_fetch_signals", AsyncMock(return_value=body)
+    )
+    client = patch.object(
+        EcoWattAPICoordinator, "async_oauth_client", AsyncMock(return_value=None)
+    )
+    return (fetch, client)
+
+
+async def run_user_flow(hass, client_id: str = "client-id") -> ConfigEntry:
+    """Creates an entry through the config flow, credential check is mocked"""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    with patch.object(AsyncOauthClient, "client", AsyncMock()):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_CLIENT_ID: client_id, CONF_CLIENT_SECRET: "s"}
+        )
+    assert result["type"] == data_entry_flow.FlowResultType.MENU
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "finish_configuration"}
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    return result["result"]
+
+
+def frozen_now(moment: datetime):
+    """Freezes the clock used by entities to pick the current hour"""
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return moment.astimezone(tz)
+
+    return patch("custom_components.rte_ecowatt.datetime", FrozenDatetime)
+
+
+async def async_simulate_hours(
+    hass, coordinator: EcoWattAPICoordinator, start: datetime, hours: int
+) -> None:
+    """Runs the hour ticks happening in the given number of hours after start"""
+    for hour in range(1, hours + 1):
+        with frozen_now(start + timedelta(hours=hour)):
+            coordinator.async_handle_hour_change(None)
+            await hass.async_block_till_done()
+
+
+def recorded_rows(hass) -> Tuple[int, int, int]:
+    """Rows in states and state_attributes tables and size of recorded attributes"""
+    with session_scope(hass=hass) as session:
+        states = session.query(States).count()
+        attributes = [row.shared_attrs for row in session.query(StateAttributes)]
+    return (states, len(attributes), sum(len(shared) for shared in attributes))
@@ -0,0 +1,49 @@
+from typing import List
+
+from homeassistant.config_entries import ConfigEntryState
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.rte_ecowatt.const import DOMAIN
+
+from .common import entry_data, patch_rte_api, signals_body
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Lets Home Assistant load rte_ecowatt from custom_components"""
+    yield
+
+
+@pytest.fixture
+def paris_hass(hass):
+    """RTE publishes data for France, days are computed in HA timezone"""
+    hass.config.set_time_zone("Europe/Paris")
+    return hass
+
+
+@pytest.fixture
+async def setup_entry(paris_hass):
+    """
+    Sets up a config entry against a mocked RTE API,
+    entries still loaded at the end of the test are unloaded
+    """
+    hass = paris_hass
+    entries: List[MockConfigEntry] = []
+
+    async def _setup(body: str = None, **entry_kwargs) -> MockConfigEntry:
+        entry_kwargs.setdefault("data", entry_data())
+        entry = MockConfigEntry(domain=DOMAIN, version=2, **entry_kwargs)
+        entry.add_to_hass(hass)
+        entries.append(entry)
+        (fetch, client) = patch_rte_api(body or signals_body())
+        with fetch, client:
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+        return entry
+
+    yield _setup
+    for entry in entries:
+        if entry.state is ConfigEntryState.LOADED:
+            assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
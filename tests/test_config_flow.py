@@ -0,0 +1,120 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant import data_entry_flow
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+import voluptuous as vol
+
+from custom_components.rte_ecowatt import entry_setting
+from custom_components.rte_ecowatt.const import (
+    CONF_MAX_STALENESS,
+    CONF_SENSOR_SHIFT,
+    CONF_STARTUP_MAX_WAIT,
+    DEFAULT_MAX_STALENESS_MINUTES,
+    DEFAULT_STARTUP_MAX_WAIT,
+    DOMAIN,
+)
+
+from .common import entry_data, run_user_flow
+
+
+@pytest.fixture
+def skip_entry_setup():
+    with patch("custom_components.rte_ecowatt.async_setup_entry", return_value=True):
+        yield
+
+
+async def test_user_flow_creates_entry(hass, skip_entry_setup):
+    entry = await run_user_flow(hass)
+    assert entry.unique_id == "client-id"
+    assert entry.title == "ecowatt by RTE"
+
+
+async def test_user_flow_numbers_entries_sharing_credential(hass, skip_entry_setup):
+    MockConfigEntry(domain=DOMAIN, version=2, unique_id="client-id").add_to_hass(hass)
+    MockConfigEntry(domain=DOMAIN, version=2, unique_id="client-id-2").add_to_hass(hass)
+    entry = await run_user_flow(hass)
+    assert entry.unique_id == "client-id-3"
+    assert entry.title == "ecowatt by RTE (3)"
+    # another credential is not numbered
+    assert (await run_user_flow(hass, "other-client")).unique_id == "other-client"
+
+
+async def _options_step(hass, entry, step_id, user_input):
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == data_entry_flow.FlowResultType.MENU
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": step_id}
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.MENU
+    return await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": "finish_configuration"}
+    )
+
+
+async def test_options_flow_sets_startup_max_wait(hass):
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=entry_data())
+    entry.add_to_hass(hass)
+    assert (
+        entry_setting(entry, CONF_STARTUP_MAX_WAIT, DEFAULT_STARTUP_MAX_WAIT)
+        == DEFAULT_STARTUP_MAX_WAIT
+    )
+
+    result = await _options_step(
+        hass, entry, "configure_startup_max_wait", {CONF_STARTUP_MAX_WAIT: 12}
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry.options[CONF_STARTUP_MAX_WAIT] == 12
+    assert entry_setting(entry, CONF_STARTUP_MAX_WAIT, DEFAULT_STARTUP_MAX_WAIT) == 12
+
+
+async def test_options_flow_keeps_previous_startup_max_wait(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data=entry_data(),
+        options={CONF_STARTUP_MAX_WAIT: 12},
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": "finish_configuration"}
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry_setting(entry, CONF_STARTUP_MAX_WAIT, DEFAULT_STARTUP_MAX_WAIT) == 12
+
+
+async def test_options_flow_sets_max_staleness(hass):
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=entry_data())
+    entry.add_to_hass(hass)
+
+    result = await _options_step(
+        hass, entry, "configure_max_staleness", {CONF_MAX_STALENESS: 45}
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry_setting(entry, CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS_MINUTES) == 45
+
+
+async def test_max_staleness_option_is_used_by_coordinator(paris_hass, setup_entry):
+    hass = paris_hass
+    entry = await setup_entry(options={CONF_MAX_STALENESS: 45})
+    coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
+    assert coordinator.scheduler.max_staleness == timedelta(minutes=45)
+
+
+@pytest.mark.parametrize("step_id", ["configure_hours_sensor", "configure_days_sensor"])
+async def test_options_flow_refuses_default_sensor_shift(hass, step_id):
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=entry_data())
+    entry.add_to_hass(hass)
+
+    with pytest.raises(vol.Invalid):
+        await _options_step(hass, entry, step_id, {CONF_SENSOR_SHIFT: 0})
@@ -0,0 +1,125 @@
+import base64
+from collections import Counter
+import json
+import time
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from custom_components.rte_ecowatt import EnedisAPICoordinator
+
+from .common import entry_data
+
+STATE_JS = "https://megacache.p.web-enedis.fr/anon/v2/shedding/state_js"
+TRACE = "https://megacache.p.web-enedis.fr/v2/g/trace"
+SHEDDING = "https://megacache.p.web-enedis.fr/v2/shedding"
+ADDRESS = "https://api-adresse.data.gouv.fr/reverse/"
+
+
+def jwt(expires_in: float) -> str:
+    payload = json.dumps({"exp": time.time() + expires_in}).encode()
+    return f"header.{base64.urlsafe_b64encode(payload).decode().rstrip('=')}.sig"
+
+
+class FakeEnedis:
+    """Answers Enedis and address api calls, statuses can be queued per endpoint"""
+
+    def __init__(self, token_lifetime: float = 3600):
+        self.token_lifetime = token_lifetime
+        self.calls: Counter = Counter()
+        self.statuses: Dict[str, List[int]] = {TRACE: [], SHEDDING: []}
+
+    def _status(self, endpoint: str) -> int:
+        return self.statuses[endpoint].pop(0) if self.statuses[endpoint] else 200
+
+    async def get(self, url: str, headers=None) -> httpx.Response:
+        if url == STATE_JS:
+            self.calls[STATE_JS] += 1
+            return httpx.Response(200, text="ok; var xtick0 = 'step';")
+        if url.startswith(ADDRESS):
+            self.calls[ADDRESS] += 1
+            feature = {"properties": {"street": "rue de la paix", "citycode": "75102"}}
+            return httpx.Response(200, json={"features": [feature]})
+        assert url.startswith(SHEDDING)
+        self.calls[SHEDDING] += 1
+        body: Dict[str, Any] = {"success": True, "eld": False, "shedding": []}
+        return httpx.Response(self._status(SHEDDING), json=body)
+
+    async def post(self, url: str, json=None) -> httpx.Response:
+        assert url == TRACE
+        self.calls[TRACE] += 1
+        status = self._status(TRACE)
+        if status != 200:
+            return httpx.Response(status, text="nope")
+        return httpx.Response(200, json={"token": jwt(self.token_lifetime)})
+
+
+@pytest.fixture
+def enedis():
+    return FakeEnedis()
+
+
+@pytest.fixture
+async def coordinator(hass, enedis):
+    coordinator = EnedisAPICoordinator(hass, entry_data())
+    coordinator._async_client = enedis
+    # retries happen without waiting
+    with patch(
+        "custom_components.rte_ecowatt.resilience.random",
+        MagicMock(uniform=MagicMock(return_value=0)),
+    ):
+        yield coordinator
+
+
+async def test_trace_server_error_is_retried(coordinator, enedis):
+    enedis.statuses[TRACE] = [503]
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert enedis.calls[TRACE] == 2
+    # the step was still valid, no need to scrape it again
+    assert enedis.calls[STATE_JS] == 1
+
+
+async def test_trace_client_error_fetches_new_step(coordinator, enedis):
+    coordinator._xtick_step = "outdated"
+    enedis.statuses[TRACE] = [403]
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert enedis.calls[TRACE] == 2
+    assert enedis.calls[STATE_JS] == 1
+
+
+async def test_steady_state_makes_one_shedding_call(coordinator, enedis):
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert enedis.calls == Counter({STATE_JS: 1, TRACE: 1, ADDRESS: 1, SHEDDING: 2})
+
+
+async def test_expired_token_is_fetched_again_with_cached_step(coordinator, enedis):
+    # expires before the safety margin
+    enedis.token_lifetime = 10
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert enedis.calls[TRACE] == 2
+    assert enedis.calls[STATE_JS] == 1
+
+
+async def test_rejected_token_is_fetched_again_once(coordinator, enedis):
+    await coordinator.async_refresh()
+    enedis.statuses[SHEDDING] = [401]
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert enedis.calls[TRACE] == 2
+    assert enedis.calls[SHEDDING] == 3
+
+
+async def test_token_rejected_twice_fails_refresh(coordinator, enedis):
+    enedis.statuses[SHEDDING] = [401, 401]
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert enedis.calls[TRACE] == 2
+    assert enedis.calls[SHEDDING] == 2
@@ -0,0 +1,102 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from homeassistant.components.calendar import CalendarEvent
+
+from custom_components.rte_ecowatt.event_index import (
+    MAX_CACHED_QUERIES,
+    CalendarEventIndex,
+)
+
+ORIGIN = datetime(2022, 12, 1, tzinfo=timezone.utc)
+
+
+def linear_scan(events, start_date, end_date):
+    """Lookup used by calendars before the index, kept as reference"""
+    relevant_events = []
+    for event in events:
+        included = event.start <= start_date and event.end >= end_date
+        included = included or (event.start >= start_date and event.start <= end_date)
+        included = included or (event.end >= start_date and event.end <= end_date)
+        if included:
+            relevant_events.append(event)
+    return relevant_events
+
+
+def random_events(rng: random.Random, count: int):
+    events = []
+    for i in range(count):
+        start = ORIGIN + timedelta(hours=rng.randrange(24 * 30))
+        end = start + timedelta(hours=rng.randrange(1, 48))
+        events.append(CalendarEvent(start=start, end=end, summary=f"event {i}"))
+    return events
+
+
+def random_window(rng: random.Random):
+    start = ORIGIN + timedelta(hours=rng.randrange(-24, 24 * 32))
+    return (start, start + timedelta(hours=rng.randrange(0, 24 * 7)))
+
+
+def _key(events):
+    return sorted((e.start, e.end, e.summary) for e in events)
+
+
+def test_empty_index():
+    index = CalendarEventIndex([])
+    assert len(index) == 0
+    assert index.query(ORIGIN, ORIGIN + timedelta(days=1)) == []
+
+
+def test_matches_linear_scan_on_random_events():
+    rng = random.Random(42)
+    for count in (1, 5, 50, 300):
+        events = random_events(rng, count)
+        index = CalendarEventIndex(events)
+        for _ in range(200):
+            (start, end) = random_window(rng)
+            assert _key(index.query(start, end)) == _key(
+                linear_scan(events, start, end)
+            )
+
+
+def test_bounds_are_included():
+    event = CalendarEvent(
+        start=ORIGIN, end=ORIGIN + timedelta(hours=1), summary="boundaries"
+    )
+    index = CalendarEventIndex([event])
+    assert index.query(ORIGIN - timedelta(hours=1), ORIGIN) == [event]
+    assert index.query(ORIGIN + timedelta(hours=1), ORIGIN + timedelta(hours=2)) == [
+        event
+    ]
+    assert index.query(ORIGIN - timedelta(hours=2), ORIGIN - timedelta(hours=1)) == []
+
+
+def test_long_event_overlapping_later_ones_is_found():
+    long_event = CalendarEvent(
+        start=ORIGIN, end=ORIGIN + timedelta(days=10), summary="long"
+    )
+    short_event = CalendarEvent(
+        start=ORIGIN + timedelta(days=1),
+        end=ORIGIN + timedelta(days=1, hours=1),
+        summary="short",
+    )
+    index = CalendarEventIndex([short_event, long_event])
+    window = (ORIGIN + timedelta(days=5), ORIGIN + timedelta(days=6))
+    assert index.query(*window) == [long_event]
+
+
+def test_cached_answers_are_not_shared_with_callers():
+    events = random_events(random.Random(1), 20)
+    index = CalendarEventIndex(events)
+    window = (ORIGIN, ORIGIN + timedelta(days=30))
+    first = index.query(*window)
+    first.clear()
+    assert _key(index.query(*window)) == _key(linear_scan(events, *window))
+
+
+def test_cache_is_bounded():
+    index = CalendarEventIndex(random_events(random.Random(2), 20))
+    for hours in range(MAX_CACHED_QUERIES * 2):
+        start = ORIGIN + timedelta(hours=hours)
+        index.query(start, start + timedelta(hours=1))
+    assert len(index._cache) <= MAX_CACHED_QUERIES
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.helpers.update_coordinator import UpdateFailed
+import pytest
+
+from custom_components.rte_ecowatt import EcoWattAPICoordinator
+from custom_components.rte_ecowatt.const import ATTR_LEVEL_CODE, DOMAIN
+from custom_components.rte_ecowatt.parsing import PARIS_TZ
+
+from .common import ALTERNATING_LEVELS, frozen_now, signals_body
+
+
+def level_now(hass) -> int:
+    state = hass.states.get("sensor.ecowatt_level_now")
+    assert state.state != STATE_UNAVAILABLE
+    return state.attributes[ATTR_LEVEL_CODE]
+
+
+@pytest.mark.parametrize("failed_refresh", [False, True])
+async def test_hour_change_uses_known_data(paris_hass, setup_entry, failed_refresh):
+    hass = paris_hass
+    ten_am = datetime.now(PARIS_TZ).replace(hour=10, minute=30)
+    with frozen_now(ten_am):
+        entry = await setup_entry(body=signals_body(hourly_levels=ALTERNATING_LEVELS))
+    coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
+    assert level_now(hass) == 3
+
+    if failed_refresh:
+        coordinator.rate_limiter.next_allowed = None
+        failing_fetch = AsyncMock(side_effect=UpdateFailed("status code was 503"))
+        with frozen_now(ten_am), patch.object(
+            EcoWattAPICoordinator, "_fetch_signals", failing_fetch
+        ):
+            await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+
+    with frozen_now(ten_am + timedelta(hours=1)):
+        coordinator.async_handle_hour_change(None)
+        await hass.async_block_till_done()
+    assert level_now(hass) == 1
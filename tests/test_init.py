@@ -0,0 +1,45 @@
+import time
+
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components.rte_ecowatt.const import (
+    CONF_SENSOR_SHIFT,
+    CONF_SENSOR_UNIT,
+    RESTORE_TIMEOUT,
+)
+
+from .common import entry_data, hourly_sensors, signals_body
+
+
+async def test_setup_and_unload(paris_hass, setup_entry):
+    hass = paris_hass
+    entry = await setup_entry(
+        body=signals_body(level=2), data=entry_data(sensors=hourly_sensors(3))
+    )
+
+    assert entry.state is ConfigEntryState.LOADED
+    sensor_states = hass.states.async_all("sensor")
+    # now, today, forecast, 3 configured sensors and the circuit breaker
+    assert len(sensor_states) == 7
+    forecast = hass.states.get("sensor.ecowatt_forecast")
+    assert forecast.attributes["hourly_levels"][0] == 2
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.NOT_LOADED
+
+
+async def test_refused_sensors_do_not_delay_setup(paris_hass, setup_entry):
+    hass = paris_hass
+    sensors = [
+        # same as the "now" sensor, from before the options flow refused it
+        {CONF_SENSOR_UNIT: "hours", CONF_SENSOR_SHIFT: 0},
+        # HA refuses the second one, its unique id is a duplicate
+        {CONF_SENSOR_UNIT: "hours", CONF_SENSOR_SHIFT: 5},
+        {CONF_SENSOR_UNIT: "hours", CONF_SENSOR_SHIFT: 5},
+    ]
+    start = time.monotonic()
+    await setup_entry(data=entry_data(sensors=sensors))
+    assert time.monotonic() - start < RESTORE_TIMEOUT.total_seconds() / 2
+    # now, today, forecast, the shift 5 sensor and the circuit breaker
+    assert len(hass.states.async_all("sensor")) == 5
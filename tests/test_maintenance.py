@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.util.dt as dt_util
+
+from custom_components.rte_ecowatt import EcoWattAPICoordinator
+from custom_components.rte_ecowatt.const import (
+    DOMAIN,
+    MAINTENANCE_STORAGE_KEY,
+    SERVICE_ADD_MAINTENANCE_WINDOW,
+)
+from custom_components.rte_ecowatt.maintenance import MaintenanceRegistry
+from custom_components.rte_ecowatt.parsing import PARIS_TZ
+
+from .common import signals_body
+
+HOUR = 3600.0
+
+
+@pytest.fixture
+def now():
+    return time.time()
+
+
+@pytest.fixture
+def utc_os_timezone(monkeypatch):
+    """Usual container setup, OS timezone differs from HA one"""
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+async def _registry(hass, *windows) -> MaintenanceRegistry:
+    registry = MaintenanceRegistry(hass)
+    await registry.async_load()
+    for (start, end) in windows:
+        await registry.async_add(start, end)
+    return registry
+
+
+async def test_window_end_at_boundaries(hass, now):
+    registry = await _registry(hass, (now + HOUR, now + 2 * HOUR))
+    assert registry.window_end(now + HOUR - 1) is None
+    # start is included, end is excluded
+    assert registry.window_end(now + HOUR) == now + 2 * HOUR
+    assert registry.window_end(now + 2 * HOUR - 1) == now + 2 * HOUR
+    assert registry.window_end(now + 2 * HOUR) is None
+
+
+async def test_overlapping_and_adjacent_windows_are_merged(hass, now):
+    registry = await _registry(
+        hass,
+        (now + HOUR, now + 3 * HOUR),
+        (now + 2 * HOUR, now + 4 * HOUR),
+        (now + 4 * HOUR, now + 5 * HOUR),
+        (now + 10 * HOUR, now + 11 * HOUR),
+    )
+    assert registry.window_end(now + HOUR) == now + 5 * HOUR
+    assert registry.window_end(now + 6 * HOUR) is None
+    assert registry.window_end(now + 10 * HOUR) == now + 11 * HOUR
+
+
+async def test_window_inside_another_does_not_shorten_it(hass, now):
+    registry = await _registry(
+        hass, (now + HOUR, now + 5 * HOUR), (now + 2 * HOUR, now + 3 * HOUR)
+    )
+    assert registry.window_end(now + 4 * HOUR) == now + 5 * HOUR
+
+
+async def test_windows_added_out_of_order(hass, now):
+    registry = await _registry(
+        hass, (now + 10 * HOUR, now + 11 * HOUR), (now + HOUR, now + 2 * HOUR)
+    )
+    assert registry.window_end(now + HOUR) == now + 2 * HOUR
+    assert registry.window_end(now + 10 * HOUR) == now + 11 * HOUR
+
+
+async def test_ended_windows_are_forgotten(hass, now):
+    registry = await _registry(hass, (now - 2 * HOUR, now - HOUR))
+    assert registry.window_end(now - 1.5 * HOUR) is None
+
+
+async def test_empty_window_is_rejected(hass, now):
+    registry = await _registry(hass)
+    with pytest.raises(ValueError):
+        await registry.async_add(now + HOUR, now + HOUR)
+
+
+async def test_windows_are_persisted(hass, hass_storage, now):
+    await _registry(hass, (now + HOUR, now + 2 * HOUR))
+    await hass.async_block_till_done()
+    assert hass_storage[MAINTENANCE_STORAGE_KEY]["data"]["windows"] == [
+        [now + HOUR, now + 2 * HOUR]
+    ]
+    registry = await _registry(hass)
+    assert registry.window_end(now + HOUR) == now + 2 * HOUR
+
+
+async def test_refresh_is_skipped_until_end_of_window(paris_hass, setup_entry):
+    hass = paris_hass
+    entry = await setup_entry()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
+    start = dt_util.now() - timedelta(minutes=5)
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_ADD_MAINTENANCE_WINDOW,
+        {"start": start, "end": start + timedelta(hours=1)},
+        blocking=True,
+    )
+    coordinator.rate_limiter.next_allowed = None
+    fetch = AsyncMock(return_value=signals_body())
+    with patch.object(EcoWattAPICoordinator, "_fetch_signals", fetch):
+        await coordinator.async_refresh()
+    fetch.assert_not_awaited()
+    assert coordinator.last_update_success
+    assert timedelta(minutes=54) < coordinator.update_interval <= timedelta(minutes=55)
+
+
+async def test_service_rejects_window_ending_before_start(paris_hass, setup_entry):
+    hass = paris_hass
+    entry = await setup_entry()
+    start = dt_util.now()
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_ADD_MAINTENANCE_WINDOW,
+            {"start": start, "end": start - timedelta(hours=1)},
+            blocking=True,
+        )
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    # service goes away with the last entry
+    assert not hass.services.has_service(DOMAIN, SERVICE_ADD_MAINTENANCE_WINDOW)
+
+
+async def test_service_reads_naive_datetimes_in_ha_timezone(
+    paris_hass, setup_entry, utc_os_timezone
+):
+    hass = paris_hass
+    await setup_entry()
+    # as sent by the datetime selector
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_ADD_MAINTENANCE_WINDOW,
+        {"start": "2030-12-06 04:15:00", "end": "2030-12-06 05:15:00"},
+        blocking=True,
+    )
+    registry = hass.data[DOMAIN]["maintenance_windows"]
+    start = datetime(2030, 12, 6, 4, 15, tzinfo=PARIS_TZ).timestamp()
+    assert registry.window_end(start - 1) is None
+    assert registry.window_end(start) == start + HOUR
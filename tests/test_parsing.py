@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+from dateutil import tz
+
+from custom_components.rte_ecowatt.parsing import parse_enedis_time, parse_rte_time
+
+
+def strptime_rte_time(value: str) -> datetime:
+    """RTE parsing used before parsing module, kept as reference"""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+
+
+def strptime_enedis_time(value: str) -> datetime:
+    """Enedis parsing used before parsing module, kept as reference"""
+    try:
+        a = datetime.strptime(value, "%d/%m/%Y %H:%M")
+    except ValueError:
+        a = datetime.strptime(value, "%d/%m/%Y %H:%M:%S")
+    return datetime(
+        a.year,
+        a.month,
+        a.day,
+        a.hour,
+        a.minute,
+        a.second,
+        tzinfo=tz.gettz("Europe/Paris"),
+    )
+
+
+def _same(a: datetime, b: datetime) -> bool:
+    return a == b and a.utcoffset() == b.utcoffset() and a.tzname() == b.tzname()
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2022-06-03T00:00:00+02:00",
+        "2022-12-12T00:00:00+01:00",
+        "2022-12-12T23:59:59+0100",
+        "2022-12-12T00:00:00Z",
+        # single digit month and day are only accepted by the strptime fallback
+        "2022-6-3T00:00:00+02:00",
+    ],
+)
+def test_rte_time_matches_strptime(value):
+    assert _same(parse_rte_time(value), strptime_rte_time(value))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "03/06/2022 08:00",
+        "03/06/2022 08:00:30",
+        "30/10/2022 02:30",
+        "27/03/2022 03:00",
+        "3/6/2022 8:00",
+        # extra spaces go through the strptime fallback
+        "03/06/2022  08:00",
+        "03/06/2022  08:00:30",
+    ],
+)
+def test_enedis_time_matches_strptime(value):
+    assert _same(parse_enedis_time(value), strptime_enedis_time(value))
+
+
+@pytest.mark.parametrize("value", ["", "03/06/2022", "03/06/2022 08", "tomorrow"])
+def test_invalid_enedis_time_raises_like_strptime(value):
+    with pytest.raises(ValueError):
+        strptime_enedis_time(value)
+    with pytest.raises(ValueError):
+        parse_enedis_time(value)
+
+
+@pytest.mark.parametrize("value", ["", "2022-06-03", "2022-06-03T00:00:00"])
+def test_invalid_rte_time_raises_like_strptime(value):
+    with pytest.raises(ValueError):
+        strptime_rte_time(value)
+    with pytest.raises(ValueError):
+        parse_rte_time(value)
+
+
+def test_enedis_time_is_in_paris_timezone():
+    assert parse_enedis_time("15/01/2023 12:00").utcoffset().total_seconds() == 3600
+    assert parse_enedis_time("15/07/2023 12:00").utcoffset().total_seconds() == 7200
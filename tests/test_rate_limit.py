@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+from custom_components.rte_ecowatt.const import RATE_LIMIT_STORAGE_KEY
+from custom_components.rte_ecowatt.rate_limit import RteRateLimiter, parse_retry_after
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("120") == timedelta(seconds=120)
+    assert parse_retry_after("-5") == timedelta(0)
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+    delay = parse_retry_after(retry_at.strftime("%a, %d %b %Y %H:%M:%S GMT"))
+    assert timedelta(minutes=9) < delay <= timedelta(minutes=10)
+
+
+def test_parse_retry_after_http_date_in_the_past():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == timedelta(0)
+
+
+def test_parse_retry_after_missing_or_invalid():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+
+
+async def test_request_consumes_quota_window(hass):
+    limiter = RteRateLimiter(hass, "client", timedelta(minutes=15))
+    assert limiter.can_request()
+    assert limiter.time_until_allowed() == timedelta(0)
+
+    await limiter.async_record_request()
+
+    assert not limiter.can_request()
+    assert limiter.next_allowed == limiter.last_request + timedelta(minutes=15)
+    assert timedelta(minutes=14) < limiter.time_until_allowed() <= timedelta(minutes=15)
+
+
+async def test_released_request_gives_quota_back(hass):
+    limiter = RteRateLimiter(hass, "client", timedelta(minutes=15))
+    await limiter.async_record_request()
+    await limiter.async_release_request()
+    assert limiter.can_request()
+    assert limiter.last_request is None
+
+
+async def test_rejection_honours_longer_retry_after(hass):
+    limiter = RteRateLimiter(hass, "client", timedelta(minutes=15))
+    await limiter.async_record_request()
+    await limiter.async_record_rejection(timedelta(hours=1))
+    assert timedelta(minutes=59) < limiter.time_until_allowed() <= timedelta(hours=1)
+
+
+async def test_rejection_waits_at_least_one_window(hass):
+    limiter = RteRateLimiter(hass, "client", timedelta(minutes=15))
+    await limiter.async_record_rejection(None)
+    assert timedelta(minutes=14) < limiter.time_until_allowed() <= timedelta(minutes=15)
+
+
+async def test_quota_survives_restart(hass, hass_storage):
+    next_allowed = datetime.now(timezone.utc) + timedelta(minutes=5)
+    hass_storage[RATE_LIMIT_STORAGE_KEY.format(client_id="client")] = {
+        "version": 1,
+        "key": RATE_LIMIT_STORAGE_KEY.format(client_id="client"),
+        "data": {
+            "last_request": (next_allowed - timedelta(minutes=15)).isoformat(),
+            "next_allowed": next_allowed.isoformat(),
+        },
+    }
+    limiter = RteRateLimiter(hass, "client", timedelta(minutes=15))
+    await limiter.async_load()
+    assert limiter.next_allowed == next_allowed
+    assert not limiter.can_request()
@@ -0,0 +1,64 @@
+import json
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.db_schema import StateAttributes
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import MAJOR_VERSION, MINOR_VERSION
+import pytest
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.rte_ecowatt.const import (
+    ATTR_DAILY_LEVELS,
+    ATTR_GENERATION_TIME,
+    ATTR_HOURLY_LEVELS,
+    ATTR_LEVEL_CODE,
+    ATTR_PERIOD_END,
+    ATTR_PERIOD_START,
+    UNRECORDED_ATTRIBUTES,
+)
+from custom_components.rte_ecowatt.recorder import exclude_attributes
+
+from .common import entry_data, hourly_sensors
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Recorder has to be set up before hass fixture"""
+    yield
+
+
+def test_hourly_changing_attributes_are_excluded(hass):
+    excluded = exclude_attributes(hass)
+    assert {ATTR_GENERATION_TIME, ATTR_PERIOD_START, ATTR_PERIOD_END} <= excluded
+
+
+def test_forecast_grid_is_excluded(hass):
+    assert {ATTR_HOURLY_LEVELS, ATTR_DAILY_LEVELS} <= exclude_attributes(hass)
+
+
+def _recorded_attribute_names(hass) -> set:
+    with session_scope(hass=hass) as session:
+        return {
+            name
+            for row in session.query(StateAttributes)
+            for name in json.loads(row.shared_attrs)
+        }
+
+
+@pytest.mark.skipif(
+    (MAJOR_VERSION, MINOR_VERSION) < (2023, 3),
+    reason="recorder matches exclude_attributes by entity domain before 2023.3",
+)
+async def test_recorder_does_not_store_excluded_attributes(paris_hass, setup_entry):
+    hass = paris_hass
+    await setup_entry(data=entry_data(sensors=hourly_sensors(2)))
+    await async_wait_recording_done(hass)
+    recorded = await get_instance(hass).async_add_executor_job(
+        _recorded_attribute_names, hass
+    )
+    assert ATTR_LEVEL_CODE in recorded
+    assert not recorded & UNRECORDED_ATTRIBUTES
+    # still available in the state machine
+    assert ATTR_HOURLY_LEVELS in hass.states.get("sensor.ecowatt_forecast").attributes
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.rte_ecowatt import EcoWattAPICoordinator
+from custom_components.rte_ecowatt.const import DOMAIN, RTE_QUOTA_WINDOW
+from custom_components.rte_ecowatt.resilience import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    TransientError,
+    async_retry,
+    jittered_backoff,
+)
+
+from .common import patch_rte_api, signals_body
+
+
+def failing(times: int, error: Exception = TransientError("boom")):
+    calls = []
+
+    async def func():
+        calls.append(None)
+        if len(calls) <= times:
+            raise error
+        return "ok"
+
+    return (func, calls)
+
+
+async def test_retry_until_success():
+    (func, calls) = failing(2)
+    assert await async_retry(func, (TransientError,), base_delay=0) == "ok"
+    assert len(calls) == 3
+
+
+async def test_retry_gives_up_after_attempts():
+    (func, calls) = failing(5)
+    with pytest.raises(TransientError):
+        await async_retry(func, (TransientError,), attempts=3, base_delay=0)
+    assert len(calls) == 3
+
+
+async def test_other_errors_are_not_retried():
+    (func, calls) = failing(1, ValueError("bad payload"))
+    with pytest.raises(ValueError):
+        await async_retry(func, (TransientError,), base_delay=0)
+    assert len(calls) == 1
+
+
+async def test_retry_delays_are_jittered_exponential():
+    (func, _) = failing(3)
+    with patch("asyncio.sleep", AsyncMock()) as sleep:
+        await async_retry(func, (TransientError,), attempts=4, base_delay=2)
+    delays = [call.args[0] for call in sleep.await_args_list]
+    assert len(delays) == 3
+    for (attempt, delay) in enumerate(delays):
+        assert 0 <= delay <= 2 * 2**attempt
+
+
+def test_jittered_backoff_bounds():
+    base = timedelta(minutes=1)
+    maximum = timedelta(minutes=30)
+    for attempt in range(10):
+        expected = min(maximum, base * 2**attempt)
+        delay = jittered_backoff(attempt, base, maximum)
+        assert expected / 2 <= delay <= expected
+
+
+def _open_since(breaker: CircuitBreaker, delay: timedelta):
+    breaker.opened_at = datetime.now(timezone.utc) - delay
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow_request()
+    assert breaker.time_until_allowed() > timedelta(minutes=29)
+
+
+def test_breaker_half_opens_after_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=timedelta(minutes=30))
+    breaker.record_failure()
+    _open_since(breaker, timedelta(minutes=31))
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request()
+    assert breaker.time_until_allowed() == timedelta(0)
+
+
+def test_half_open_failure_doubles_reset_timeout_up_to_maximum():
+    breaker = CircuitBreaker(
+        failure_threshold=1,
+        reset_timeout=timedelta(minutes=30),
+        max_reset_timeout=timedelta(hours=1, minutes=30),
+    )
+    breaker.record_failure()
+    timeouts = []
+    for _ in range(3):
+        _open_since(breaker, breaker.reset_timeout)
+        assert breaker.state == STATE_HALF_OPEN
+        breaker.record_failure()
+        assert breaker.state == STATE_OPEN
+        timeouts.append(breaker.reset_timeout)
+    assert timeouts == [
+        timedelta(hours=1),
+        timedelta(hours=1, minutes=30),
+        timedelta(hours=1, minutes=30),
+    ]
+
+
+def test_success_closes_and_resets_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=timedelta(minutes=30))
+    breaker.record_failure()
+    _open_since(breaker, breaker.reset_timeout)
+    breaker.record_failure()
+    _open_since(breaker, breaker.reset_timeout)
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 0
+    assert breaker.reset_timeout == timedelta(minutes=30)
+    assert breaker.retry_at is None
+
+
+async def test_failed_refresh_retries_once_quota_allows(paris_hass, setup_entry):
+    hass = paris_hass
+    entry = await setup_entry()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["rte_coordinator"]
+    # the quota window has just started with the first refresh
+    coordinator.rate_limiter.next_allowed = datetime.now(timezone.utc)
+
+    with patch.object(
+        EcoWattAPICoordinator,
+        "_fetch_signals",
+        AsyncMock(side_effect=UpdateFailed("status code was 503")),
+    ), patch_rte_api(signals_body())[1]:
+        await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    # instead of waiting for next publication window
+    assert coordinator.update_interval <= timedelta(minutes=1)
+
+    coordinator.rate_limiter.next_allowed = datetime.now(timezone.utc)
+    (fetch, client) = patch_rte_api(signals_body())
+    with fetch, client:
+        await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.update_interval >= RTE_QUOTA_WINDOW
@@ -0,0 +1,126 @@
+"""RTE token caching and signals calls, against a mocked HTTP session"""
+import time
+from typing import List
+from unittest.mock import AsyncMock, patch
+
+from async_oauthlib import OAuth2Session
+import pytest
+
+from custom_components.rte_ecowatt import AsyncOauthClient, EcoWattAPICoordinator
+from custom_components.rte_ecowatt.const import TOKEN_STORAGE_KEY
+
+from .common import entry_data, signals_body
+
+TOKEN = {"access_token": "abc", "token_type": "Bearer", "expires_in": 3600}
+
+
+class FakeResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.headers = {}
+
+    async def text(self) -> str:
+        return signals_body()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSignals:
+    """Answers signals calls with queued statuses, then 200"""
+
+    def __init__(self):
+        self.statuses: List[int] = []
+        self.calls = 0
+
+    def get(self, url, headers=None) -> FakeResponse:
+        self.calls += 1
+        return FakeResponse(self.statuses.pop(0) if self.statuses else 200)
+
+
+@pytest.fixture
+def fetch_token():
+    with patch.object(
+        OAuth2Session, "fetch_token", AsyncMock(side_effect=lambda **_: dict(TOKEN))
+    ) as fetch_token:
+        yield fetch_token
+
+
+@pytest.fixture
+def signals():
+    signals = FakeSignals()
+    with patch.object(
+        OAuth2Session, "get", lambda _self, *a, **kw: signals.get(*a, **kw)
+    ):
+        yield signals
+
+
+@pytest.fixture
+async def coordinator(hass, fetch_token, signals):
+    coordinator = EcoWattAPICoordinator(hass, entry_data())
+    await coordinator.async_load()
+    yield coordinator
+    await coordinator.async_close()
+
+
+async def test_token_is_reused_while_valid(hass, fetch_token):
+    client = AsyncOauthClient(entry_data(), hass)
+    await client.client()
+    await client.client()
+    assert fetch_token.await_count == 1
+    assert client.token_cache_hits == 1
+    await client.async_close()
+
+
+async def test_token_is_fetched_again_once_expired(hass, fetch_token):
+    client = AsyncOauthClient(entry_data(), hass)
+    await client.client()
+    client._token_expires_at = time.time() - 1
+    await client.client()
+    assert fetch_token.await_count == 2
+    await client.async_close()
+
+
+@pytest.mark.parametrize(("expires_in", "fetches"), [(3600, 0), (-1, 1)])
+async def test_persisted_token_is_reused_until_expiry(
+    hass, hass_storage, fetch_token, expires_in, fetches
+):
+    config = entry_data()
+    hass_storage[TOKEN_STORAGE_KEY.format(client_id="client-id")] = {
+        "version": 1,
+        "data": {"token": dict(TOKEN), "expires_at": time.time() + expires_in},
+    }
+    # as after a restart
+    client = AsyncOauthClient(config, hass)
+    await client.async_load_token()
+    await client.client()
+    assert fetch_token.await_count == fetches
+    await client.async_close()
+
+
+async def test_signals_are_fetched_with_cached_token(coordinator, fetch_token, signals):
+    await coordinator.async_refresh()
+    coordinator.rate_limiter.next_allowed = None
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert signals.calls == 2
+    assert fetch_token.await_count == 1
+
+
+async def test_rejected_token_is_fetched_again_once(coordinator, fetch_token, signals):
+    signals.statuses = [401]
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert signals.calls == 2
+    assert fetch_token.await_count == 2
+
+
+async def test_token_rejected_twice_fails_refresh(coordinator, fetch_token, signals):
+    signals.statuses = [401, 401]
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert signals.calls == 2
+    assert fetch_token.await_count == 2
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+from custom_components.rte_ecowatt.parsing import PARIS_TZ
+from custom_components.rte_ecowatt.scheduling import (
+    MAX_HISTORY,
+    WINDOW_AFTER,
+    PublicationScheduler,
+)
+
+MIN_INTERVAL = timedelta(minutes=16)
+MAX_STALENESS = timedelta(minutes=120)
+
+
+def paris(hour: int, minute: int = 0, day: int = 12) -> datetime:
+    return datetime(2022, 12, day, hour, minute, tzinfo=PARIS_TZ)
+
+
+def scheduler(*publications: datetime) -> PublicationScheduler:
+    result = PublicationScheduler(MIN_INTERVAL, MAX_STALENESS)
+    for publication in publications:
+        result.record(publication)
+    return result
+
+
+def test_polls_at_min_interval_until_a_publication_is_known():
+    assert scheduler().next_interval(paris(3)) == MIN_INTERVAL
+
+
+def test_max_staleness_is_never_below_min_interval():
+    assert (
+        PublicationScheduler(MIN_INTERVAL, timedelta(minutes=1)).max_staleness
+        == MIN_INTERVAL
+    )
+
+
+def test_publications_are_bucketed_in_paris_time():
+    result = scheduler(paris(17, 7), paris(17, 13, day=13), paris(8, 31))
+    assert result.expected_publications() == [8 * 60 + 30, 17 * 60]
+
+
+def test_same_generation_time_is_recorded_once():
+    result = scheduler(paris(17, 7), paris(17, 7))
+    assert result.history == [17 * 60 + 7]
+
+
+def test_history_is_bounded():
+    result = scheduler(*(paris(hour % 24, day=1 + hour // 24) for hour in range(60)))
+    assert len(result.history) == MAX_HISTORY
+
+
+def test_polls_densely_around_expected_publication():
+    result = scheduler(paris(17, 0))
+    assert result.next_interval(paris(16, 50)) == MIN_INTERVAL
+    assert result.next_interval(paris(17, 30)) == MIN_INTERVAL
+
+
+def test_backs_off_far_from_publications():
+    result = scheduler(paris(17, 0))
+    assert result.next_interval(paris(3)) == MAX_STALENESS
+
+
+def test_wakes_up_for_the_window_before_publication():
+    result = scheduler(paris(17, 0))
+    # window opens at 16:45
+    assert result.next_interval(paris(16, 0)) == timedelta(minutes=45)
+
+
+def test_window_before_midnight_publication_wraps_from_previous_day():
+    result = scheduler(paris(0, 5))
+    # window of a 00:00 bucket opens at 23:45 the day before
+    assert result.next_interval(paris(23, 50)) == MIN_INTERVAL
+    assert result.next_interval(paris(23, 0)) == timedelta(minutes=45)
+
+
+def test_window_after_late_publication_wraps_past_midnight():
+    result = scheduler(paris(23, 50))
+    # 23:45 bucket, window lasts until well after midnight
+    assert result.next_interval(paris(0, 30, day=13)) == MIN_INTERVAL
+    window_end = paris(23, 45) + WINDOW_AFTER + timedelta(minutes=15)
+    after_window = window_end + timedelta(minutes=5)
+    assert result.next_interval(after_window) == MAX_STALENESS
+
+
+def test_now_in_utc_is_converted_to_paris_time():
+    result = scheduler(paris(17, 0))
+    now = paris(16, 50).astimezone(timezone.utc)
+    assert result.next_interval(now) == MIN_INTERVAL
+
+
+def test_wait_never_goes_below_min_interval():
+    result = scheduler(paris(17, 0))
+    # window opens in 5 minutes
+    assert result.next_interval(paris(16, 40)) == MIN_INTERVAL
@@ -0,0 +1,104 @@
+"""Tests for entries sharing one RTE coordinator"""
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.rte_ecowatt import EcoWattAPICoordinator
+from custom_components.rte_ecowatt.const import (
+    CONF_CLIENT_ID,
+    CONF_MAX_STALENESS,
+    DOMAIN,
+)
+
+from .common import entry_data, patch_rte_api, run_user_flow, signals_body
+
+
+async def test_entries_share_coordinator(paris_hass, setup_entry):
+    hass = paris_hass
+    first = await setup_entry(unique_id="client-id", options={CONF_MAX_STALENESS: 120})
+    second = await setup_entry(
+        unique_id="client-id-2", options={CONF_MAX_STALENESS: 45}
+    )
+
+    coordinator = hass.data[DOMAIN][first.entry_id]["rte_coordinator"]
+    assert hass.data[DOMAIN][second.entry_id]["rte_coordinator"] is coordinator
+    assert coordinator.scheduler.max_staleness == timedelta(minutes=45)
+
+    registry = er.async_get(hass)
+    assert registry.async_get_entity_id("sensor", DOMAIN, "ecowatt-forecast")
+    assert registry.async_get_entity_id(
+        "sensor", DOMAIN, f"ecowatt-forecast-{second.entry_id}"
+    )
+
+    # the strictest entry leaving relaxes the shared coordinator
+    assert await hass.config_entries.async_unload(second.entry_id)
+    await hass.async_block_till_done()
+    assert coordinator.scheduler.max_staleness == timedelta(minutes=120)
+
+    assert await hass.config_entries.async_unload(first.entry_id)
+    await hass.async_block_till_done()
+    assert not hass.data[DOMAIN]["rte_coordinators"]
+
+
+async def test_failed_load_is_not_cached(paris_hass, setup_entry):
+    hass = paris_hass
+    first = MockConfigEntry(
+        domain=DOMAIN, version=2, unique_id="client-id", data=entry_data()
+    )
+    first.add_to_hass(hass)
+    failing_load = patch.object(
+        EcoWattAPICoordinator, "async_load", AsyncMock(side_effect=ValueError)
+    )
+    with failing_load:
+        assert not await hass.config_entries.async_setup(first.entry_id)
+        await hass.async_block_till_done()
+    assert first.state is ConfigEntryState.SETUP_ERROR
+    assert not hass.data[DOMAIN]["rte_coordinators"]
+
+    # another entry with the same credential loads from scratch
+    second = await setup_entry(unique_id="client-id-2")
+    assert second.state is ConfigEntryState.LOADED
+
+
+async def test_flow_created_entry_shares_credential(paris_hass, setup_entry):
+    hass = paris_hass
+    first = await setup_entry(unique_id="client-id")
+    (fetch, client) = patch_rte_api(signals_body())
+    with fetch, client:
+        second = await run_user_flow(hass)
+        await hass.async_block_till_done()
+
+    assert second.unique_id == "client-id-2"
+    assert second.state is ConfigEntryState.LOADED
+    coordinator = hass.data[DOMAIN][first.entry_id]["rte_coordinator"]
+    assert hass.data[DOMAIN][second.entry_id]["rte_coordinator"] is coordinator
+    registry = er.async_get(hass)
+    for unique_id in ("ecowatt-forecast", "ecowatt-level-in-0-hours"):
+        assert registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{unique_id}-{second.entry_id}"
+        )
+    assert await hass.config_entries.async_unload(second.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_entries_with_different_credentials_share_coordinator(
+    paris_hass, setup_entry
+):
+    hass = paris_hass
+    first = await setup_entry(unique_id="client-id")
+    second = await setup_entry(
+        unique_id="other-client", data=entry_data(client_id="other-client")
+    )
+    coordinator = hass.data[DOMAIN][first.entry_id]["rte_coordinator"]
+    assert hass.data[DOMAIN][second.entry_id]["rte_coordinator"] is coordinator
+    assert coordinator.config[CONF_CLIENT_ID] == "client-id"
+
+    # credential of an unloaded entry is not used anymore
+    assert await hass.config_entries.async_unload(first.entry_id)
+    await hass.async_block_till_done()
+    assert coordinator.config[CONF_CLIENT_ID] == "other-client"
+    assert coordinator.oauth_client.config[CONF_CLIENT_ID] == "other-client"
+    assert coordinator.data is not None
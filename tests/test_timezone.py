@@ -0,0 +1,29 @@
+from dateutil import tz
+
+from custom_components.rte_ecowatt import TimezoneResolver
+from custom_components.rte_ecowatt.const import DOMAIN
+
+
+async def test_resolver_caches_timezone(paris_hass):
+    resolver = TimezoneResolver(paris_hass)
+    assert resolver.tzinfo is tz.gettz("Europe/Paris")
+    paris_hass.config.set_time_zone("America/New_York")
+    # not invalidated yet
+    assert resolver.tzinfo is tz.gettz("Europe/Paris")
+    resolver.async_invalidate()
+    assert resolver.tzinfo is tz.gettz("America/New_York")
+
+
+async def test_core_config_update_invalidates_coordinator_timezone(
+    paris_hass, setup_entry
+):
+    hass = paris_hass
+    entry = await setup_entry()
+    coordinators = hass.data[DOMAIN][entry.entry_id]
+    assert coordinators["rte_coordinator"]._timezone() is tz.gettz("Europe/Paris")
+
+    await hass.config.async_update(time_zone="America/New_York")
+    await hass.async_block_till_done()
+
+    for name in ("rte_coordinator", "enedis_coordinator"):
+        assert coordinators[name]._timezone() is tz.gettz("America/New_York")